@@ -1,48 +1,300 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, File, Form, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from ..models.schemas import PackingRequest, PackingResponse
+from ..models.schemas import (
+    AnalyticsResponse, PackingRequest, PackingResponse, StoredOptimization,
+    ValidationRequest, ValidationResponse
+)
 from ..models.sql_models import OptimizationRecord
-from ..services.packer import PackingEngine
+from ..controllers.packing_controller import PackingController
+from ..services.analytics import record_run, summarize, week_start
+from ..services.admission import AdmissionController, AdmissionRejected
+from ..services.cancellation import CancellationToken, JobCancelled
+from ..services.executor import PackingExecutor
+from ..services.jobs import encode_job
+from ..services.manifest import read_manifest
+from ..services.stored_plans import load_json, packed_bins
+from ..services.validator import find_out_of_bounds, find_overlaps
 from ..database import get_db
+from .. import config
+from typing import Optional
+import asyncio
+import hashlib
 import json
+import logging
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+admission = AdmissionController(
+    max_concurrent=config.MAX_CONCURRENT_JOBS,
+    max_inflight_cost=config.MAX_INFLIGHT_COST,
+    max_queue=config.MAX_QUEUED_JOBS,
+    queue_timeout=config.QUEUE_TIMEOUT_SECONDS,
+    max_items=config.MAX_ITEMS,
+    max_bins=config.MAX_BINS,
+    interactive_max_cost=config.INTERACTIVE_MAX_COST,
+    batch_weight=config.BATCH_WEIGHT,
+    aging_rate=config.AGING_RATE,
+    batch_queue_timeout=config.BATCH_QUEUE_TIMEOUT_SECONDS,
+)
+
+# Started/stopped with the app (see main.py)
+executor = PackingExecutor(config.PACKING_WORKERS)
+
+# How often a running optimize request checks whether its client is still there
+DISCONNECT_POLL_SECONDS = 0.5
 
 @router.post("/optimize", response_model=PackingResponse)
-def optimize_loading(request: PackingRequest, db: Session = Depends(get_db)):
+async def optimize_loading(request: PackingRequest, http_request: Request, db: Session = Depends(get_db)):
+    result = await _run_packing(request, http_request)
+    return await run_in_threadpool(_finish, db, request, result)
+
+@router.post("/optimize/upload", response_model=PackingResponse)
+async def optimize_upload(
+    http_request: Request,
+    file: UploadFile = File(...),
+    bins: str = Form(..., description='JSON list of bins, e.g. [{"width": 100, "height": 100, "depth": 100}]'),
+    engine: str = Form("greedy"),
+    min_support: float = Form(0.75),
+    search_iterations: int = Form(0),
+    compact: bool = Form(False),
+    resolution: Optional[float] = Form(None),
+    stats: bool = Form(False),
+    priority: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Packs a CSV/XLSX manifest. The file is streamed row by row and identical
+    rows are merged into quantities, so memory follows the number of SKUs.
+    """
     try:
-        # Initialize Engine with Bin
-        engine = PackingEngine(request.bin)
-        
-        # Execute Packing
-        packed, unpacked = engine.pack(request.items)
-        
-        # Calculate Stats (Efficiency)
-        total_bin_vol = request.bin.width * request.bin.height * request.bin.depth
-        used_vol = sum(i.width * i.height * i.depth for i in packed)
+        request = PackingRequest(
+            bins=json.loads(bins),
+            items=[],
+            engine=engine,
+            min_support=min_support,
+            search_iterations=search_iterations,
+            compact=compact,
+            resolution=resolution,
+            stats=stats,
+            priority=priority or None,
+        )
+        manifest = await run_in_threadpool(read_manifest, file.file, file.filename, config.MAX_ITEMS)
+    except (ValueError, ValidationError) as e:
+        # ManifestError, bad JSON and invalid options alike
+        raise HTTPException(status_code=400, detail=str(e))
+    request.items = manifest.items
+
+    result = await _run_packing(request, http_request)
+    return await run_in_threadpool(_finish, db, request, result)
+
+async def _run_packing(request: PackingRequest, http_request: Request) -> tuple:
+    """
+    Admits the job and runs it in the process pool, keeping the event loop free.
+    The job is cancelled (and nothing is stored) when the client disconnects
+    or it runs past JOB_TIMEOUT_SECONDS.
+    """
+    unit_count = sum(item.quantity for item in request.items)
+    try:
+        admission.check_size(unit_count, len(request.bins))
+        cost = admission.estimate_cost(unit_count, len(request.bins), request.search_iterations)
+        with executor.cancellation(config.JOB_TIMEOUT_SECONDS) as token:
+            started = asyncio.Event()
+            work = asyncio.ensure_future(_admit_and_run(request, cost, token, started))
+            watcher = asyncio.ensure_future(_watch_disconnect(http_request, token, work, started))
+            try:
+                return await work
+            except asyncio.CancelledError:
+                if started.is_set() or not token.cancelled:
+                    # The request itself is being torn down: stop the job too.
+                    # A running job keeps its cancel slot and admission until it
+                    # has stopped (see PackingExecutor.run)
+                    token.cancel()
+                    raise
+                # Client left while the job was still queued
+                executor.record_cancelled("cancelled")
+                raise JobCancelled("cancelled")
+            finally:
+                watcher.cancel()
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+    except JobCancelled as e:
+        if e.reason == "timeout":
+            raise HTTPException(status_code=504, detail="Packing exceeded the server time limit")
+        # Nobody is listening any more; 499 is what proxies log for this
+        raise HTTPException(status_code=499, detail="Client closed request")
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _admit_and_run(request: PackingRequest, cost: int, token: CancellationToken,
+                         started: asyncio.Event) -> tuple:
+    async with admission.admit(cost, request.priority):
+        started.set()
+        return await executor.run(encode_job(request, token), token)
+
+async def _watch_disconnect(http_request: Request, token: CancellationToken,
+                            work: asyncio.Future, started: asyncio.Event):
+    while not await http_request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_SECONDS)
+    token.cancel()
+    if not started.is_set():
+        # Still queued: leave the queue now instead of waiting for a slot
+        work.cancel()
+
+@router.post("/validate", response_model=ValidationResponse)
+def validate_plan(request: ValidationRequest):
+    """
+    Checks a (possibly hand-edited) plan for overlapping and out-of-bounds boxes.
+    """
+    overlaps, out_of_bounds, truncated = [], [], False
+    for idx, plan_bin in enumerate(request.bins):
+        bin_id = plan_bin.bin_id or f"Bin {idx + 1}"
+        items = plan_bin.items
+
+        for i in find_out_of_bounds(plan_bin.bin, items):
+            out_of_bounds.append({"bin_id": bin_id, "item_id": items[i].id})
+
+        pairs, bin_truncated = find_overlaps(items)
+        truncated = truncated or bin_truncated
+        for a, b in pairs:
+            overlaps.append({"bin_id": bin_id, "first_id": items[a].id, "second_id": items[b].id})
+
+    return ValidationResponse(
+        valid=not overlaps and not out_of_bounds,
+        overlaps=overlaps,
+        out_of_bounds=out_of_bounds,
+        truncated=truncated
+    )
+
+@router.get(
+    "/optimizations/{record_id}",
+    response_model=StoredOptimization,
+    responses={304: {"description": "Plan unchanged since the ETag in If-None-Match"}},
+)
+def get_optimization(record_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    A stored run, with an ETag so clients can revalidate instead of re-downloading.
+    The ETag is weak: the gzip and identity encodings of a plan share it.
+    """
+    record = db.query(OptimizationRecord).filter(OptimizationRecord.id == record_id).first()
+    if record is None:
+        raise HTTPException(status_code=404, detail="Optimization not found")
+
+    # Records are never updated, so the stored columns fully determine the body:
+    # a 304 is answered without parsing or serializing the plan
+    etag = _record_etag(record)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={config.PLAN_CACHE_MAX_AGE}"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        # GZipMiddleware only adds Vary to the bodies it compresses
+        return Response(status_code=304, headers=dict(headers, Vary="Accept-Encoding"))
+
+    try:
+        plan = StoredOptimization(
+            id=record.id,
+            created_at=record.created_at,
+            bin_width=record.bin_width,
+            bin_height=record.bin_height,
+            bin_depth=record.bin_depth,
+            item_count=record.item_count,
+            efficiency=record.efficiency,
+            items=load_json(record.items_json),
+            # Older runs stored a flat item list: served as a single bin
+            packed_bins=packed_bins(record),
+            unpacked_items=load_json(record.unpacked_items_json),
+        )
+    except (ValueError, KeyError, TypeError) as e:
+        # ValidationError and bad JSON included: the record predates every known format
+        logger.warning("stored optimization %s is unreadable: %s", record_id, e)
+        raise HTTPException(status_code=422, detail="Stored optimization is in an unsupported format")
+    return Response(content=plan.json(), media_type="application/json", headers=headers)
+
+@router.get("/analytics", response_model=AnalyticsResponse)
+def get_analytics(weeks: int = Query(12, ge=1, le=520), db: Session = Depends(get_db)):
+    """
+    Efficiency and utilization report, read from the rollup table only.
+    """
+    return summarize(db, weeks)
+
+@router.get("/metrics")
+def get_metrics():
+    return {"admission": admission.snapshot(), "executor": executor.snapshot()}
+
+def _finish(db: Session, request: PackingRequest, result: tuple) -> PackingResponse:
+    """
+    Builds the response and stores the run (inputs and placements in grouped form).
+    """
+    controller = PackingController()
+    response = controller.build_response(request, result)
+    grouped_bins = controller.group_placements(request, result)
+    if response.stats is not None:
+        logger.info("packing stats: %s", response.stats.json(exclude={"trace"}))
+
+    try:
+        # Calculate Stats (Efficiency over the bins that were actually opened)
+        opened_bins = request.bins[:len(grouped_bins)]
+        total_bin_vol = sum(b.width * b.height * b.depth for b in opened_bins)
+        used_vol = sum(
+            g["efficiency"] / 100 * b.width * b.height * b.depth
+            for g, b in zip(grouped_bins, opened_bins)
+        )
         efficiency = (used_vol / total_bin_vol) * 100 if total_bin_vol > 0 else 0
+        first_bin = request.bins[0] if request.bins else None
         
         # Save to Database
         db_record = OptimizationRecord(
-            bin_width=request.bin.width,
-            bin_height=request.bin.height,
-            bin_depth=request.bin.depth,
-            item_count=len(request.items),
-            items_json=json.dumps([item.dict() for item in request.items]), # Store inputs
+            bin_width=first_bin.width if first_bin else 0,
+            bin_height=first_bin.height if first_bin else 0,
+            bin_depth=first_bin.depth if first_bin else 0,
+            item_count=response.total_items,
+            items_json=json.dumps([item.dict() for item in request.items]), # Store inputs (with quantities)
             efficiency=efficiency,
-            packed_items_json=json.dumps([item.dict() for item in packed]), # Store results
-            unpacked_items_json=json.dumps([item.dict() for item in unpacked])
+            packed_items_json=json.dumps(grouped_bins), # Store results grouped per SKU
+            unpacked_items_json=json.dumps([item.dict() for item in response.unpacked_items])
         )
         db.add(db_record)
+        record_run(
+            db,
+            week_start(),
+            (db_record.bin_width, db_record.bin_height, db_record.bin_depth),
+            item_count=response.total_items,
+            packed_count=response.packed_count,
+            bins_opened=len(opened_bins),
+            bin_volume=total_bin_vol,
+            used_volume=used_vol,
+            efficiency_sum=efficiency,
+        )
         db.commit()
         db.refresh(db_record)
         
-        return PackingResponse(
-            packed_items=packed,
-            unpacked_items=unpacked,
-            efficiency=round(efficiency, 2)
-        )
+        response.record_id = db_record.id
+        return response
     except Exception as e:
         import traceback
         traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _record_etag(record: OptimizationRecord) -> str:
+    digest = hashlib.sha256()
+    for part in (record.id, record.created_at, record.bin_width, record.bin_height, record.bin_depth,
+                 record.item_count, record.efficiency, record.items_json,
+                 record.packed_items_json, record.unpacked_items_json):
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison: a W/ prefix does not prevent a match
+    if not if_none_match:
+        return False
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
@@ -0,0 +1,36 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Serving: uvicorn worker processes, and packing processes per uvicorn worker
+# (0 = pack in the threadpool of the serving process)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", 1))
+PACKING_WORKERS = int(os.getenv("PACKING_WORKERS", max(1, (os.cpu_count() or 1) // max(1, WEB_CONCURRENCY))))
+
+# Admission control for the optimize routes
+# Cost of a job is estimated as item count x bin count (x search passes)
+MAX_ITEMS = int(os.getenv("MAX_ITEMS", 5000))
+MAX_BINS = int(os.getenv("MAX_BINS", 50))
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", max(1, PACKING_WORKERS)))
+MAX_INFLIGHT_COST = int(os.getenv("MAX_INFLIGHT_COST", 100000))
+MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", 16))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("QUEUE_TIMEOUT_SECONDS", 15))
+
+# Scheduling of queued jobs: shortest estimated job first, by priority class.
+# Jobs up to INTERACTIVE_MAX_COST are "interactive" unless the request says otherwise;
+# batch jobs count BATCH_WEIGHT times their estimated run time, and every second
+# waited takes AGING_RATE seconds off it so large runs are never starved
+INTERACTIVE_MAX_COST = int(os.getenv("INTERACTIVE_MAX_COST", 5000))
+BATCH_WEIGHT = float(os.getenv("BATCH_WEIGHT", 4))
+AGING_RATE = float(os.getenv("AGING_RATE", 1))
+BATCH_QUEUE_TIMEOUT_SECONDS = float(os.getenv("BATCH_QUEUE_TIMEOUT_SECONDS", 60))
+
+# Server-side deadline of a packing run, queueing included (0 = none); late runs get 504
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", 120))
+
+# HTTP: responses at least this large (bytes) are gzip-compressed
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", 1024))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+# Stored plans never change: clients may reuse them this long before revalidating
+PLAN_CACHE_MAX_AGE = int(os.getenv("PLAN_CACHE_MAX_AGE", 3600))
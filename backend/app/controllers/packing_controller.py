@@ -1,31 +1,139 @@
-from fastapi import HTTPException
-from ..models.schemas import PackingRequest, PackingResponse
-from ..services.packer import PackingEngine
+from ..models.schemas import PackingRequest, PackingResponse, PackingStats
+from ..services.geometry import Quantizer
+from ..services.orientation import rotate
+from typing import List, Optional
 
 class PackingController:
     """
     Controller for handling packing requests.
     Follows OOP principles to separate request handling from business logic.
     """
-    def __init__(self):
-        self.engine = PackingEngine()
-
-    def optimize(self, request: PackingRequest) -> PackingResponse:
-        try:
-            # Execute Packing using the engine
-            packed_bins, unpacked_items = self.engine.pack(request.bins, request.items)
-            
-            # Calculate Statistics
-            total_items_count = len(request.items)
-            packed_items_count = sum(len(b["packed_items"]) for b in packed_bins)
-            
-            # Construct Response
-            return PackingResponse(
-                packed_bins=packed_bins,
-                unpacked_items=unpacked_items,
-                total_items=total_items_count,
-                packed_count=packed_items_count
-            )
-        except Exception as e:
-            # Log error here if logging was configured
-            raise HTTPException(status_code=500, detail=str(e))
+    def group_placements(self, request: PackingRequest, result: tuple) -> List[dict]:
+        """
+        Compact form of a job result: per bin, the positions of every SKU group.
+        """
+        packed_bins_result = self._to_request_units(request, result)[0]
+
+        packed_bins = []
+        for idx, (efficiency, placements) in enumerate(packed_bins_result):
+            groups = {}
+            for item_index, x, y, z, rotation in placements:
+                positions, rotations = groups.setdefault(item_index, ([], []))
+                positions.append([x, y, z])
+                rotations.append(rotation)
+            packed_bins.append({
+                "bin_id": f"Bin {idx + 1}",
+                "efficiency": efficiency,
+                "placements": [
+                    {
+                        "item_id": request.items[i].id,
+                        "positions": positions,
+                        "rotations": rotations if any(rotations) else None,
+                    }
+                    for i, (positions, rotations) in groups.items()
+                ],
+            })
+        return packed_bins
+
+    def build_response(self, request: PackingRequest, result: tuple) -> PackingResponse:
+        """
+        Maps a compact job result (see services/jobs.py) back onto the request items.
+        SKU groups are expanded to one item per placed unit here, unless the
+        request asked for the compact grouped form.
+        """
+        packed_bins_result, unpacked, stats = self._to_request_units(request, result)
+
+        if request.compact:
+            packed_bins = [
+                dict(b, packed_items=[]) for b in self.group_placements(request, result)
+            ]
+        else:
+            unit_numbers = [0] * len(request.items)
+            packed_bins = []
+            for idx, (efficiency, placements) in enumerate(packed_bins_result):
+                packed_items = []
+                for item_index, x, y, z, rotation in placements:
+                    item = request.items[item_index]
+                    update = {}
+                    if item.quantity > 1:
+                        unit_numbers[item_index] += 1
+                        update.update(id=f"{item.id}-{unit_numbers[item_index]}", quantity=1)
+                    if rotation:
+                        # Report the placed orientation through the dimensions
+                        dims = rotate((item.width, item.height, item.depth), rotation)
+                        update.update(zip(("width", "height", "depth"), dims))
+                    if update:
+                        item = item.copy(update=update)
+                    item.x, item.y, item.z = x, y, z
+                    packed_items.append(item)
+                packed_bins.append({
+                    "bin_id": f"Bin {idx + 1}",
+                    "packed_items": packed_items,
+                    "efficiency": efficiency
+                })
+
+        # Units left over stay grouped: one item per SKU with the remaining quantity
+        unpacked_items = [
+            request.items[i].copy(update={"quantity": count}) if count != request.items[i].quantity
+            else request.items[i]
+            for i, count in unpacked
+        ]
+
+        # Calculate Statistics
+        total_items_count = sum(i.quantity for i in request.items)
+        packed_items_count = sum(len(placements) for _, placements in packed_bins_result)
+        
+        # Construct Response
+        return PackingResponse(
+            packed_bins=packed_bins,
+            unpacked_items=unpacked_items,
+            total_items=total_items_count,
+            packed_count=packed_items_count,
+            stats=self.build_stats(request, stats)
+        )
+
+    def build_stats(self, request: PackingRequest, stats: Optional[dict]) -> Optional[PackingStats]:
+        """
+        Maps the job's profiling counters (keyed by item index) onto item ids.
+        """
+        if stats is None:
+            return None
+        ids = [item.id for item in request.items]
+        return PackingStats(**dict(
+            stats,
+            fit_failures={ids[i]: n for i, n in stats["fit_failures"].items()},
+            trace=[
+                {"item_id": ids[i], "bin_id": f"Bin {b + 1}", "position": position, "candidates_tested": tested}
+                for i, b, position, tested in stats["trace"]
+            ],
+        ))
+
+    def _to_request_units(self, request: PackingRequest, result: tuple) -> tuple:
+        """
+        Converts grid-unit positions of a quantized job, including the ones in
+        its trace, back to request units. Efficiency is recomputed from the
+        real sizes, since the grid rounds items up and bins down.
+        """
+        if not request.resolution:
+            return result
+        q = Quantizer(request.resolution)
+        packed_bins_result, unpacked, stats = result
+
+        converted = []
+        for bin_dims, (_, placements) in zip(request.bins, packed_bins_result):
+            used_vol = 0.0
+            for item_index, _, _, _, _ in placements:
+                item = request.items[item_index]
+                used_vol += item.width * item.height * item.depth
+            bin_vol = bin_dims.width * bin_dims.height * bin_dims.depth
+            efficiency = round((used_vol / bin_vol) * 100, 2) if bin_vol > 0 else 0
+            converted.append((efficiency, [
+                (item_index, q.to_units(x), q.to_units(y), q.to_units(z), rotation)
+                for item_index, x, y, z, rotation in placements
+            ]))
+        if stats is not None:
+            stats = dict(stats, trace=[
+                (i, b, [q.to_units(v) for v in position] if position else None, tested)
+                for i, b, position, tested in stats["trace"]
+            ])
+        return converted, unpacked, stats
@@ -1,19 +1,31 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
-from app.api.endpoints import router
+from app.api.endpoints import router, executor
 # Import models to ensure tables are created
 from app.models import sql_models 
 from app.database import engine
+from app import config
 from dotenv import load_dotenv
+import logging
 import os
 
 load_dotenv()
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
 
 # Create Tables
 sql_models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="FlexStore 3D API", version="2.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-warm the packing process pool before serving traffic
+    executor.start()
+    yield
+    executor.shutdown()
+
+app = FastAPI(title="FlexStore 3D API", version="2.0", lifespan=lifespan)
 
 # CORS Configuration
 origins = os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
@@ -24,8 +36,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the dashboard read ETags for conditional re-fetches of stored plans
+    expose_headers=["ETag"],
 )
 
+# Large packing responses are repetitive JSON: compress them
+app.add_middleware(GZipMiddleware, minimum_size=config.GZIP_MINIMUM_SIZE, compresslevel=config.GZIP_LEVEL)
+
 # Register Router
 app.include_router(router)
 
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Literal
+from datetime import date, datetime
 
 class Item(BaseModel):
     id: str
@@ -8,6 +9,13 @@ class Item(BaseModel):
     height: float
     depth: float
     color: str
+    # Number of identical units of this SKU
+    quantity: int = Field(1, ge=1)
+    # Optional physical constraints
+    weight: Optional[float] = Field(None, ge=0)
+    max_stack_weight: Optional[float] = Field(None, ge=0)  # Max weight resting on top of this item
+    # Allowed rotations: as given, about the vertical axis only ("this side up"), or all six
+    rotation: Literal["none", "upright", "any"] = "none"
     # Coordinates (Output)
     x: Optional[float] = 0
     y: Optional[float] = 0
@@ -21,17 +29,129 @@ class Bin(BaseModel):
 class PackingRequest(BaseModel):
     bins: List[Bin]
     items: List[Item]
+    # Optional: improve the plan by searching over item insertion order (0 = plain greedy)
+    search_iterations: int = Field(0, ge=0, le=2000)
+    # Packing engine: corner-point greedy or maximal-empty-space model
+    engine: Literal["greedy", "ems"] = "greedy"
+    # Minimum supported fraction of each box base (0 = allow floating boxes)
+    min_support: float = Field(0.75, ge=0, le=1)
+    # Return placements grouped per SKU instead of one item per unit
+    compact: bool = False
+    # Optional integer geometry: snap sizes to a grid of this step (e.g. 0.1 = mm for cm inputs)
+    resolution: Optional[float] = Field(None, gt=0)
+    # Profiling: return algorithm counters, and trace every n-th placement attempt (0 = no trace)
+    stats: bool = False
+    trace_sample: int = Field(0, ge=0)
+    # Scheduling class; by default small jobs are interactive and large ones batch
+    priority: Optional[Literal["interactive", "batch"]] = None
+
+class GroupPlacement(BaseModel):
+    item_id: str
+    positions: List[List[float]]  # [x, y, z] per placed unit
+    # Per placed unit, index into services/orientation.ROTATIONS; omitted when no unit is rotated
+    rotations: Optional[List[int]] = None
 
 class PackedBin(BaseModel):
     bin_id: str
     packed_items: List[Item]
     efficiency: float
+    # Compact form: set instead of packed_items when the request asks for it
+    placements: Optional[List[GroupPlacement]] = None
+
+class TraceEntry(BaseModel):
+    item_id: str
+    bin_id: str
+    position: Optional[List[float]] = None  # None when the item did not fit
+    candidates_tested: int
+
+class PackingStats(BaseModel):
+    candidates_generated: int
+    candidates_tested: int
+    intersect_calls: int
+    support_checks: int
+    placements: int
+    fit_failures: Dict[str, int]
+    bin_seconds: List[float]
+    search_evaluations: int
+    cache_hits: int
+    cache_misses: int
+    trace: List[TraceEntry] = []
 
 class PackingResponse(BaseModel):
     packed_bins: List[PackedBin]
     unpacked_items: List[Item]
     total_items: int
     packed_count: int
+    stats: Optional[PackingStats] = None
+    record_id: Optional[int] = None  # Stored run, see GET /optimizations/{record_id}
+
+class PlanBin(BaseModel):
+    bin_id: Optional[str] = None
+    bin: Bin
+    items: List[Item]
+
+class ValidationRequest(BaseModel):
+    bins: List[PlanBin]
+
+class OverlapPair(BaseModel):
+    bin_id: str
+    first_id: str
+    second_id: str
+
+class OutOfBounds(BaseModel):
+    bin_id: str
+    item_id: str
+
+class ValidationResponse(BaseModel):
+    valid: bool
+    overlaps: List[OverlapPair]
+    out_of_bounds: List[OutOfBounds]
+    # True when a bin had more overlaps than are reported
+    truncated: bool = False
+
+class StoredPlacement(BaseModel):
+    item_id: str
+    positions: List[List[float]]
+    rotations: Optional[List[int]] = None
+
+class StoredBin(BaseModel):
+    bin_id: str
+    efficiency: float
+    placements: List[StoredPlacement]
+
+class StoredOptimization(BaseModel):
+    id: int
+    created_at: Optional[datetime] = None
+    bin_width: float
+    bin_height: float
+    bin_depth: float
+    item_count: int
+    efficiency: float
+    items: List[Item]
+    packed_bins: List[StoredBin]
+    unpacked_items: List[Item]
+
+class AnalyticsSummary(BaseModel):
+    runs: int
+    item_count: int
+    packed_count: int
+    bins_opened: int
+    average_efficiency: float  # Mean of per-run efficiencies (%)
+    utilization: float  # Used volume over opened bin volume (%)
+
+class WeeklyAnalytics(AnalyticsSummary):
+    period_start: date
+
+class BinSizeAnalytics(AnalyticsSummary):
+    bin_width: float
+    bin_height: float
+    bin_depth: float
+
+class AnalyticsResponse(BaseModel):
+    since: date
+    totals: AnalyticsSummary
+    weeks: List[WeeklyAnalytics]
+    bin_sizes: List[BinSizeAnalytics]
 
 class HealthCheck(BaseModel):
     status: str
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON, UniqueConstraint
 from sqlalchemy.sql import func
 from ..database import Base
 
@@ -19,3 +19,39 @@ class OptimizationRecord(Base):
     efficiency = Column(Float)
     packed_items_json = Column(JSON) # Store result
     unpacked_items_json = Column(JSON)
+
+class OptimizationRollup(Base):
+    """
+    Running totals of optimization_records per week and container size.
+    Updated in the same transaction as every record, so reports never
+    have to read the JSON columns.
+    """
+    __tablename__ = "optimization_rollups"
+    __table_args__ = (
+        UniqueConstraint("period_start", "bin_width", "bin_height", "bin_depth", name="uq_rollup_period_bin"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    period_start = Column(Date, nullable=False, index=True)  # Monday of the week (UTC)
+    bin_width = Column(Float, nullable=False)
+    bin_height = Column(Float, nullable=False)
+    bin_depth = Column(Float, nullable=False)
+
+    runs = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    packed_count = Column(Integer, nullable=False, default=0)
+    bins_opened = Column(Integer, nullable=False, default=0)
+    bin_volume = Column(Float, nullable=False, default=0.0)  # Volume of the opened bins
+    used_volume = Column(Float, nullable=False, default=0.0)
+    efficiency_sum = Column(Float, nullable=False, default=0.0)  # Sum of per-run efficiencies
+
+
+class MaintenanceMarker(Base):
+    """
+    One row per one-off data migration that has run (see tools/rebuild_rollups.py).
+    The primary key makes a second, concurrent run fail instead of repeating the work.
+    """
+    __tablename__ = "maintenance_markers"
+
+    name = Column(String, primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,222 @@
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import asyncio
+import math
+import time
+
+# Share of a class's queue timeout after which a waiting job outranks any new arrival
+STARVATION_FRACTION = 0.5
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a packing job is refused. Carries the HTTP status to return
+    and, for overload rejections, a Retry-After hint in seconds.
+    """
+    def __init__(self, status_code: int, detail: str, retry_after: int = None):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> dict:
+        return {"Retry-After": str(self.retry_after)} if self.retry_after else {}
+
+
+class _Waiter:
+    __slots__ = ("cost", "priority", "enqueued", "future")
+
+    def __init__(self, cost: int, priority: str, future: "asyncio.Future"):
+        self.cost = cost
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.future = future
+
+
+class AdmissionController:
+    """
+    Bounds the CPU-bound packing work running at once.
+    A job is admitted while fewer than `max_concurrent` jobs run and the summed
+    cost stays within `max_inflight_cost` (a job larger than the budget may run
+    alone). Others wait, up to `max_queue` of them and for at most their class's
+    queue timeout; beyond that callers get 429 / 503 with Retry-After.
+
+    Waiting jobs are served shortest-estimated-job first, weighted by
+    priority class: the next job is the one with the lowest
+        estimated seconds x class weight - aging_rate x seconds waited
+    so interactive requests overtake batch runs, but only ones that would
+    finish within the time a batch job has already waited. A job also ages
+    in proportion to its own estimate, so after STARVATION_FRACTION of its
+    queue timeout it comes before every newly queued job whatever its size.
+    Only the chosen job may take a free slot, so small jobs never starve it
+    by slipping past.
+    """
+    PRIORITIES = ("interactive", "batch")
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_inflight_cost: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_items: int,
+        max_bins: int,
+        interactive_max_cost: int = 5000,
+        batch_weight: float = 4.0,
+        aging_rate: float = 1.0,
+        batch_queue_timeout: Optional[float] = None,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_inflight_cost = max_inflight_cost
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_items = max_items
+        self.max_bins = max_bins
+        self.interactive_max_cost = interactive_max_cost
+        self.aging_rate = aging_rate
+        self.weights = {"interactive": 1.0, "batch": batch_weight}
+        self.queue_timeouts = {
+            "interactive": queue_timeout,
+            "batch": batch_queue_timeout if batch_queue_timeout is not None else queue_timeout,
+        }
+
+        self.inflight = 0
+        self.inflight_cost = 0
+        self._waiters: List[_Waiter] = []
+        # Per class: admitted jobs and their summed queue wait
+        self.class_stats: Dict[str, dict] = {
+            name: {"admitted": 0, "wait_seconds": 0.0} for name in self.PRIORITIES
+        }
+        # Running estimate used for Retry-After hints
+        self.seconds_per_cost = 1e-4
+        self.counters = {
+            "admitted": 0,
+            "completed": 0,
+            "rejected_too_large": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+        }
+
+    @staticmethod
+    def estimate_cost(item_count: int, bin_count: int, search_iterations: int = 0) -> int:
+        # Every search iteration replays about half of the greedy pass
+        passes = 1 + search_iterations / 2
+        return max(1, int(item_count * max(1, bin_count) * passes))
+
+    def classify(self, cost: int) -> str:
+        """
+        Default priority class for a job of this cost.
+        """
+        return "interactive" if cost <= self.interactive_max_cost else "batch"
+
+    def check_size(self, item_count: int, bin_count: int):
+        if item_count > self.max_items or bin_count > self.max_bins:
+            self.counters["rejected_too_large"] += 1
+            raise AdmissionRejected(
+                413,
+                f"Manifest too large: limit is {self.max_items} items and {self.max_bins} bins"
+            )
+
+    @asynccontextmanager
+    async def admit(self, cost: int, priority: Optional[str] = None):
+        """
+        Holds a work slot for the duration of the block.
+        """
+        priority = priority or self.classify(cost)
+        if not self._waiters and self._has_room(cost):
+            self._grant(cost, priority, 0.0)
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self.counters["rejected_queue_full"] += 1
+                raise AdmissionRejected(429, "Too many packing jobs queued", self.retry_after())
+
+            future = asyncio.get_running_loop().create_future()
+            entry = _Waiter(cost, priority, future)
+            self._waiters.append(entry)
+            try:
+                await asyncio.wait_for(future, self.queue_timeouts[priority])
+            except BaseException as exc:
+                if future.done() and not future.cancelled():
+                    # Slot was granted just as we gave up on it
+                    self._release(cost)
+                else:
+                    if entry in self._waiters:
+                        self._waiters.remove(entry)
+                    self._wake()
+                if isinstance(exc, asyncio.TimeoutError):
+                    self.counters["rejected_timeout"] += 1
+                    raise AdmissionRejected(503, "Packing service is saturated", self.retry_after())
+                raise
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.seconds_per_cost = 0.8 * self.seconds_per_cost + 0.2 * (elapsed / cost)
+            self.counters["completed"] += 1
+            self._release(cost)
+
+    def retry_after(self) -> int:
+        queued_cost = sum(w.cost for w in self._waiters)
+        backlog = (self.inflight_cost + queued_cost) * self.seconds_per_cost / self.max_concurrent
+        return max(1, math.ceil(backlog))
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        classes = {}
+        for name in self.PRIORITIES:
+            waiting = [w for w in self._waiters if w.priority == name]
+            stats = self.class_stats[name]
+            classes[name] = {
+                "queued": len(waiting),
+                "oldest_wait_seconds": max((now - w.enqueued for w in waiting), default=0.0),
+                "admitted": stats["admitted"],
+                "average_wait_seconds": stats["wait_seconds"] / stats["admitted"] if stats["admitted"] else 0.0,
+            }
+        return {
+            "inflight": self.inflight,
+            "inflight_cost": self.inflight_cost,
+            "queued": len(self._waiters),
+            "seconds_per_cost": self.seconds_per_cost,
+            "classes": classes,
+            **self.counters,
+        }
+
+    def _has_room(self, cost: int) -> bool:
+        if self.inflight >= self.max_concurrent:
+            return False
+        return self.inflight == 0 or self.inflight_cost + cost <= self.max_inflight_cost
+
+    def _grant(self, cost: int, priority: str, waited: float):
+        self.inflight += 1
+        self.inflight_cost += cost
+        self.counters["admitted"] += 1
+        stats = self.class_stats[priority]
+        stats["admitted"] += 1
+        stats["wait_seconds"] += waited
+
+    def _release(self, cost: int):
+        self.inflight -= 1
+        self.inflight_cost -= cost
+        self._wake()
+
+    def _wake(self):
+        while self._waiters:
+            now = time.monotonic()
+            entry = min(self._waiters, key=lambda w: self._key(w, now))
+            if not self._has_room(entry.cost):
+                return
+            self._waiters.remove(entry)
+            if entry.future.done():
+                continue
+            self._grant(entry.cost, entry.priority, now - entry.enqueued)
+            entry.future.set_result(True)
+
+    def _key(self, waiter: _Waiter, now: float) -> float:
+        estimate = waiter.cost * self.seconds_per_cost * self.weights[waiter.priority]
+        # Fresh jobs have a positive key, so once this reaches 0 nothing new overtakes it
+        patience = self.queue_timeouts[waiter.priority] * STARVATION_FRACTION
+        rate = max(self.aging_rate, estimate / patience) if patience > 0 else self.aging_rate
+        return estimate - rate * (now - waiter.enqueued)
@@ -0,0 +1,152 @@
+from ..models.sql_models import MaintenanceMarker, OptimizationRecord, OptimizationRollup
+from .stored_plans import packed_bins as stored_packed_bins
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+# Marker row written by the one-off rollup backfill
+BACKFILL_MARKER = "optimization_rollups_backfill"
+
+# Counters summed into a rollup row by every run
+ROLLUP_COUNTERS = (
+    "runs", "item_count", "packed_count", "bins_opened",
+    "bin_volume", "used_volume", "efficiency_sum",
+)
+
+
+def week_start(moment: Optional[datetime] = None) -> date:
+    """
+    Monday (UTC) of the week containing `moment` (default: now).
+    """
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+def record_run(db: Session, period_start: date, bin_dims: tuple, **counters):
+    """
+    Adds one run to its (week, bin size) rollup row.
+    Does not commit: call it before committing the OptimizationRecord so both
+    land in the same transaction. Counters are incremented in SQL, so
+    concurrent writers never overwrite each other's totals.
+    """
+    values = dict(counters, runs=1)
+    key = {
+        "period_start": period_start,
+        "bin_width": bin_dims[0],
+        "bin_height": bin_dims[1],
+        "bin_depth": bin_dims[2],
+    }
+    if _increment(db, key, values):
+        return
+    try:
+        # Savepoint: losing a race on the unique key must not roll back the record
+        with db.begin_nested():
+            db.add(OptimizationRollup(**key, **values))
+    except IntegrityError:
+        _increment(db, key, values)
+
+
+def _increment(db: Session, key: dict, values: dict) -> bool:
+    updated = db.query(OptimizationRollup).filter_by(**key).update(
+        {getattr(OptimizationRollup, name): getattr(OptimizationRollup, name) + value
+         for name, value in values.items()},
+        synchronize_session=False,
+    )
+    return updated > 0
+
+
+def rebuild_rollups(db: Session) -> Optional[int]:
+    """
+    One-off backfill from optimization_records, for databases that predate
+    the rollup table. Returns the number of records counted, or None if the
+    backfill already ran.
+    The marker row is written in the same transaction as the rollups, so
+    repeated or concurrent runs count history exactly once. Refuses to run
+    once the service has started filling the rollups itself, since those
+    records would be counted twice.
+    Records from before SKU quantities, which stored a flat list of packed
+    items, count as one opened bin.
+    """
+    if db.query(MaintenanceMarker).filter_by(name=BACKFILL_MARKER).first() is not None:
+        return None
+    if db.query(OptimizationRollup.id).first() is not None:
+        raise RuntimeError(
+            "optimization_rollups already has rows; run the backfill before serving "
+            "traffic with the rollup-enabled version"
+        )
+    db.add(MaintenanceMarker(name=BACKFILL_MARKER))
+    try:
+        # Claims the marker key now: a concurrent run blocks here, then fails
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return None
+
+    count = 0
+    for record in db.query(OptimizationRecord).yield_per(500):
+        try:
+            packed_bins = stored_packed_bins(record)
+        except (TypeError, ValueError, KeyError, AttributeError):
+            packed_bins = []
+        packed_count = sum(len(p["positions"]) for b in packed_bins for p in b.get("placements", []))
+        bin_volume = (record.bin_width or 0) * (record.bin_height or 0) * (record.bin_depth or 0)
+        # Older records only keep the first bin's size: assume all opened bins match it
+        opened_volume = bin_volume * len(packed_bins)
+        record_run(
+            db,
+            week_start(record.created_at),
+            (record.bin_width or 0, record.bin_height or 0, record.bin_depth or 0),
+            item_count=record.item_count or 0,
+            packed_count=packed_count,
+            bins_opened=len(packed_bins),
+            bin_volume=opened_volume,
+            used_volume=(record.efficiency or 0) / 100 * opened_volume,
+            efficiency_sum=record.efficiency or 0,
+        )
+        count += 1
+    db.commit()
+    return count
+
+
+def summarize(db: Session, weeks: int) -> dict:
+    """
+    Report over the last `weeks` weeks, read from the rollup table only:
+    totals, one row per week and one row per container size.
+    """
+    since = week_start() - timedelta(weeks=weeks - 1)
+    totals = [func.sum(getattr(OptimizationRollup, name)).label(name) for name in ROLLUP_COUNTERS]
+    base = db.query(*totals).filter(OptimizationRollup.period_start >= since)
+
+    by_week = base.add_columns(OptimizationRollup.period_start) \
+        .group_by(OptimizationRollup.period_start) \
+        .order_by(OptimizationRollup.period_start)
+    size_columns = (OptimizationRollup.bin_width, OptimizationRollup.bin_height, OptimizationRollup.bin_depth)
+    by_size = base.add_columns(*size_columns).group_by(*size_columns).order_by(func.sum(OptimizationRollup.runs).desc())
+
+    return {
+        "since": since,
+        "totals": _summary_row(base.one()),
+        "weeks": [dict(_summary_row(row), period_start=row.period_start) for row in by_week],
+        "bin_sizes": [
+            dict(_summary_row(row), bin_width=row.bin_width, bin_height=row.bin_height, bin_depth=row.bin_depth)
+            for row in by_size
+        ],
+    }
+
+
+def _summary_row(row) -> dict:
+    runs = row.runs or 0
+    bin_volume = row.bin_volume or 0.0
+    return {
+        "runs": runs,
+        "item_count": row.item_count or 0,
+        "packed_count": row.packed_count or 0,
+        "bins_opened": row.bins_opened or 0,
+        "average_efficiency": round(row.efficiency_sum / runs, 2) if runs else 0.0,
+        "utilization": round(row.used_volume / bin_volume * 100, 2) if bin_volume else 0.0,
+    }
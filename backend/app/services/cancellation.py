@@ -0,0 +1,62 @@
+from typing import Optional
+import time
+
+# Shared cancel flags (one byte per slot) visible to this process.
+# The executor creates them and installs them in every worker.
+_flags = None
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a packing job once its token trips. `reason` is
+    "cancelled" (the client went away) or "timeout" (server deadline).
+    """
+    def __init__(self, reason: str = "cancelled"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation for one packing job.
+    The serving process trips it by setting the job's byte in the shared flag
+    array; the engine calls check() between items and bins, which also
+    enforces the job's wall-clock deadline (epoch seconds).
+    """
+    __slots__ = ("flags", "slot", "deadline")
+
+    def __init__(self, flags=None, slot: int = -1, deadline: Optional[float] = None):
+        self.flags = flags if slot >= 0 else None
+        self.slot = slot
+        self.deadline = deadline
+
+    @property
+    def cancelled(self) -> bool:
+        return self.flags is not None and self.flags[self.slot] != 0
+
+    def cancel(self):
+        if self.flags is not None:
+            self.flags[self.slot] = 1
+
+    def check(self):
+        if self.flags is not None and self.flags[self.slot]:
+            raise JobCancelled("cancelled")
+        if self.deadline is not None and time.time() > self.deadline:
+            raise JobCancelled("timeout")
+
+
+def install_flags(flags):
+    """
+    Makes the shared flag array available to jobs run in this process.
+    """
+    global _flags
+    _flags = flags
+
+
+def job_token(slot: int, deadline: Optional[float]) -> Optional[CancellationToken]:
+    """
+    Worker-side token for a job's (slot, deadline) options, or None if it has neither.
+    """
+    if slot < 0 and deadline is None:
+        return None
+    return CancellationToken(_flags, slot, deadline)
@@ -0,0 +1,144 @@
+from ..models.schemas import Item, Bin
+from .packer import PackingEngine, BinState
+from .orientation import Orientation, orientation_table
+from typing import List, Optional, Tuple
+
+# A maximal empty space as (x1, y1, z1, x2, y2, z2)
+Space = Tuple[float, float, float, float, float, float]
+
+
+class EMSBinState(BinState):
+    """
+    Bin state extended with the list of maximal empty spaces (EMS).
+    """
+    def __init__(self, bin_dims: Bin):
+        super().__init__(bin_dims)
+        self.spaces: List[Space] = [(0, 0, 0, bin_dims.width, bin_dims.height, bin_dims.depth)]
+
+    def copy(self, share_height_map: bool = False) -> "EMSBinState":
+        clone = super().copy(share_height_map)
+        clone.spaces = self.spaces[:]
+        return clone
+
+    def size(self) -> int:
+        return super().size() + len(self.spaces)
+
+
+class EMSPackingEngine(PackingEngine):
+    """
+    3D Bin Packing Engine based on Maximal Empty Spaces.
+    Free space is kept as a list of maximal free cuboids, so checking a
+    position is a containment test against one EMS instead of a collision
+    scan over every packed box.
+    """
+    state_class = EMSBinState
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.spaces: List[Space] = []
+        self.min_dimension = 0
+
+    def prepare(self, items: List[Item], bins: Optional[List[Bin]] = None):
+        super().prepare(items, bins)
+        # Spaces thinner than the smallest item side can never be used
+        # (a rotation only permutes sides, so this holds for every orientation)
+        self.min_dimension = min((min(i.width, i.height, i.depth) for i in items), default=0)
+
+    def bind_state(self, state: EMSBinState):
+        super().bind_state(state)
+        self.spaces = state.spaces
+
+    def _find_best_position(self, item: Item):
+        """
+        Picks the EMS closest to the origin that can contain the item,
+        placing the item at that space's minimum corner.
+        All orientations are tested against each space in the same pass;
+        ties go to the preferred (earlier) orientation.
+        """
+        orientations = self.orientations.get(id(item))
+        if orientations is None:
+            orientations = self.orientations[id(item)] = orientation_table(item)
+
+        stats = self.stats
+        if stats is not None:
+            stats.candidates_generated += len(self.spaces)
+
+        fitting = []
+        for x1, y1, z1, x2, y2, z2 in self.spaces:
+            for order, orientation in enumerate(orientations):
+                if (orientation[0] <= x2 - x1 and
+                    orientation[1] <= y2 - y1 and
+                    orientation[2] <= z2 - z1):
+                    fitting.append((x1**2 + y1**2 + z1**2, order, (x1, y1, z1, orientation)))
+        if not fitting:
+            return None
+
+        if self.height_map is None:
+            if stats is not None:
+                stats.candidates_tested += 1
+            return min(fitting)[2]
+
+        # With support tracking, take the closest corner the box can rest on
+        fitting.sort()
+        for _, _, position in fitting:
+            if stats is not None:
+                stats.candidates_tested += 1
+            x, y, z, orientation = position
+            if self._is_stable(item, x, y, z, orientation[0], orientation[2]):
+                return position
+        return None
+
+    def _place(self, item: Item, position: Tuple[float, float, float, Orientation]):
+        super()._place(item, position)
+        x, y, z, (w, h, d, _) = position
+        self._split_spaces((x, y, z, x + w, y + h, z + d))
+
+    def _split_spaces(self, box: Space):
+        """
+        Replaces every EMS overlapping the box by its (up to six) residual
+        spaces, then drops residuals contained in another space.
+        """
+        bx1, by1, bz1, bx2, by2, bz2 = box
+        kept: List[Space] = []
+        residuals: List[Space] = []
+
+        for space in self.spaces:
+            x1, y1, z1, x2, y2, z2 = space
+            if not (bx1 < x2 and bx2 > x1 and by1 < y2 and by2 > y1 and bz1 < z2 and bz2 > z1):
+                kept.append(space)
+                continue
+            if bx1 > x1:
+                residuals.append((x1, y1, z1, bx1, y2, z2))
+            if bx2 < x2:
+                residuals.append((bx2, y1, z1, x2, y2, z2))
+            if by1 > y1:
+                residuals.append((x1, y1, z1, x2, by1, z2))
+            if by2 < y2:
+                residuals.append((x1, by2, z1, x2, y2, z2))
+            if bz1 > z1:
+                residuals.append((x1, y1, z1, x2, y2, bz1))
+            if bz2 < z2:
+                residuals.append((x1, y1, bz2, x2, y2, z2))
+
+        # Untouched spaces stay maximal: a residual is a subset of a removed space,
+        # so only residuals need checking. Larger candidates first means a space
+        # can only be contained in one already accepted.
+        residuals.sort(key=_volume, reverse=True)
+        min_dimension = self.min_dimension
+        for space in residuals:
+            x1, y1, z1, x2, y2, z2 = space
+            if x2 - x1 < min_dimension or y2 - y1 < min_dimension or z2 - z1 < min_dimension:
+                continue
+            # Inlined containment test: this loop dominates the split cost
+            for o in kept:
+                if o[0] <= x1 and o[1] <= y1 and o[2] <= z1 and o[3] >= x2 and o[4] >= y2 and o[5] >= z2:
+                    break
+            else:
+                kept.append(space)
+
+        # Mutate in place: the list is shared with the bound BinState
+        self.spaces[:] = kept
+
+
+def _volume(space: Space) -> float:
+    return (space[3] - space[0]) * (space[4] - space[1]) * (space[5] - space[2])
@@ -0,0 +1,172 @@
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from .cancellation import CancellationToken, JobCancelled, install_flags
+from .jobs import run_job
+from typing import Dict, List, Optional
+import asyncio
+import multiprocessing
+import time
+
+# Jobs that can be cancelled at the same time (running or queued)
+CANCEL_SLOTS = 1024
+# A job whose worker process died is retried once on a fresh pool
+MAX_JOB_ATTEMPTS = 2
+
+
+def _warm_up(_) -> int:
+    # Keeps the worker busy briefly so every process in the pool gets spawned
+    time.sleep(0.05)
+    return 0
+
+
+class PackingExecutor:
+    """
+    Runs compact packing jobs (see services/jobs.py) in a pre-warmed process pool,
+    so packing escapes the GIL and the event loop stays free.
+    With workers=0 (or before start()) jobs run in a thread pool instead.
+
+    Every job can get a CancellationToken backed by a byte of a shared array
+    handed to the workers at spawn, so a running job can be stopped without
+    killing its process. A slot stays reserved until its job has really
+    stopped, so a late-finishing worker never trips the next job's flag.
+
+    A worker that dies (killed, out of memory) breaks the whole pool: it is
+    replaced on the spot and the jobs it failed are retried once, so one
+    crash never takes the service down.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pool: ProcessPoolExecutor = None
+        # Fallback for workers=0, created on first use
+        self.threads: ThreadPoolExecutor = None
+        self.flags = multiprocessing.get_context("spawn").RawArray("b", CANCEL_SLOTS)
+        self._free_slots: List[int] = list(range(CANCEL_SLOTS - 1, -1, -1))
+        # Future of the job submitted under each reserved slot
+        self._jobs: Dict[int, Future] = {}
+        self.counters = {"cancelled": 0, "timed_out": 0, "pool_restarts": 0}
+
+    def start(self):
+        # Jobs in the thread pool read the flags from this process
+        install_flags(self.flags)
+        if self.workers <= 0 or self.pool is not None:
+            return
+        self.pool = self._new_pool()
+        list(self.pool.map(_warm_up, range(self.workers)))
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: never fork a process that already runs the server's threads
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=install_flags,
+            initargs=(self.flags,),
+        )
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """
+        Swaps a broken pool for a fresh one. Every job of the broken pool
+        reports it, so only the first report for that pool does anything.
+        """
+        if broken is None or self.pool is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+        self.counters["pool_restarts"] += 1
+        # Re-warm without blocking the event loop; jobs queue behind this
+        for _ in range(self.workers):
+            self.pool.submit(_warm_up, None)
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+        if self.threads is not None:
+            self.threads.shutdown(wait=False, cancel_futures=True)
+            self.threads = None
+
+    @contextmanager
+    def cancellation(self, timeout: Optional[float] = None):
+        """
+        Reserves a cancel slot for one job; the token also carries the
+        server-side deadline. With every slot taken only the deadline applies.
+        If the block is left while its job still runs, the slot is released
+        once that job has finished.
+        """
+        slot = self._free_slots.pop() if self._free_slots else -1
+        deadline = time.time() + timeout if timeout else None
+        token = CancellationToken(self.flags, slot, deadline)
+        try:
+            yield token
+        finally:
+            if slot >= 0:
+                job = self._jobs.get(slot)
+                if job is not None and not job.done():
+                    loop = asyncio.get_running_loop()
+                    job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._free_slot, slot))
+                else:
+                    self._free_slot(slot)
+
+    def _free_slot(self, slot: int):
+        self._jobs.pop(slot, None)
+        self.flags[slot] = 0
+        self._free_slots.append(slot)
+
+    async def run(self, job: tuple, token: Optional[CancellationToken] = None) -> tuple:
+        """
+        Runs one job. If the caller is cancelled while the job is running, the
+        job is cancelled too and this waits for it to stop before re-raising,
+        so the caller's admission slot covers the whole run.
+        A job lost with a broken pool is retried on the replacement pool;
+        BrokenProcessPool is raised if it breaks that one too.
+        """
+        try:
+            for attempt in range(1, MAX_JOB_ATTEMPTS + 1):
+                future = self._submit(job)
+                pool = self.pool
+                if token is not None and token.slot >= 0:
+                    self._jobs[token.slot] = future
+                try:
+                    return await self._wait(future, token)
+                except BrokenProcessPool:
+                    self._replace_pool(pool)
+                    if attempt == MAX_JOB_ATTEMPTS:
+                        raise
+        except JobCancelled as e:
+            self.record_cancelled(e.reason)
+            raise
+
+    async def _wait(self, future: Future, token: Optional[CancellationToken]) -> tuple:
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            if not future.done():
+                # Already running: stop it at its next check and wait for that
+                if token is not None:
+                    token.cancel()
+                try:
+                    await asyncio.wrap_future(future)
+                except JobCancelled as e:
+                    self.record_cancelled(e.reason)
+                except Exception:
+                    # Nobody reads the result any more
+                    pass
+            raise
+
+    def _submit(self, job: tuple) -> Future:
+        if self.pool is not None:
+            try:
+                return self.pool.submit(run_job, job)
+            except BrokenProcessPool:
+                # Broke since the last job finished, before anyone replaced it
+                self._replace_pool(self.pool)
+                return self.pool.submit(run_job, job)
+        if self.threads is None:
+            self.threads = ThreadPoolExecutor(thread_name_prefix="packing")
+        return self.threads.submit(run_job, job)
+
+    def record_cancelled(self, reason: str):
+        self.counters["timed_out" if reason == "timeout" else "cancelled"] += 1
+
+    def snapshot(self) -> dict:
+        return {"workers": self.workers, **self.counters}
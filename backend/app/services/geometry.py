@@ -0,0 +1,26 @@
+import math
+
+# Guards against float noise right at a grid line (e.g. 0.3 / 0.1 = 2.9999999999999996)
+GRID_EPSILON = 1e-9
+
+
+class Quantizer:
+    """
+    Snaps geometry onto an integer grid of `resolution` input units
+    (e.g. 0.1 = millimetres when dimensions are given in centimetres).
+    Item sizes round up and bin sizes round down, so every plan found on
+    the grid is still valid in real units. Inside the engine all sums and
+    comparisons are then exact integer arithmetic.
+    """
+    def __init__(self, resolution: float):
+        self.resolution = resolution
+
+    def size(self, value: float) -> int:
+        return math.ceil(value / self.resolution - GRID_EPSILON)
+
+    def capacity(self, value: float) -> int:
+        return math.floor(value / self.resolution + GRID_EPSILON)
+
+    def to_units(self, value: int) -> float:
+        # round() strips the binary noise of the multiplication (3 * 0.1 -> 0.3)
+        return round(value * self.resolution, 9)
@@ -0,0 +1,93 @@
+from typing import Dict, Tuple
+import math
+
+
+class HeightMap:
+    """
+    2.5D height map of a bin: the floor is split into a grid and every cell
+    keeps the top surface height and the index of the packed item forming it
+    (-1 for the bin floor).
+    A cell belongs to a footprint when its center lies inside it, so all
+    queries cost O(cells under the footprint), independent of item count.
+
+    Surfaces are compared exactly: a resting height is always read back from
+    the map, and tops are stored as y + height just like the engines compute them.
+    """
+    __slots__ = ("nx", "nz", "cell_x", "cell_z", "heights", "owners")
+
+    def __init__(self, width: float, depth: float, cell_size: float = 1.0, max_cells: int = 128):
+        cell_size = cell_size if cell_size > 0 else 1.0
+        self.nx = max(1, min(max_cells, math.ceil(width / cell_size)))
+        self.nz = max(1, min(max_cells, math.ceil(depth / cell_size)))
+        self.cell_x = width / self.nx if width > 0 else 1
+        self.cell_z = depth / self.nz if depth > 0 else 1
+        self.heights = [0] * (self.nx * self.nz)
+        self.owners = [-1] * (self.nx * self.nz)
+
+    def copy(self) -> "HeightMap":
+        clone = HeightMap.__new__(HeightMap)
+        clone.nx, clone.nz = self.nx, self.nz
+        clone.cell_x, clone.cell_z = self.cell_x, self.cell_z
+        clone.heights = self.heights[:]
+        clone.owners = self.owners[:]
+        return clone
+
+    def _span(self, start: float, size: float, cell: float, count: int) -> Tuple[int, int]:
+        # Cells whose center lies in [start, start + size)
+        first = max(0, math.ceil(start / cell - 0.5))
+        last = min(count, math.ceil((start + size) / cell - 0.5))
+        if first >= last:
+            # Footprint narrower than a cell: use the cell under its center
+            middle = min(count - 1, max(0, int((start + size / 2) / cell)))
+            return middle, middle + 1
+        return first, last
+
+    def _rows(self, x: float, z: float, width: float, depth: float):
+        """
+        Yields (start, end) flat-index ranges, one per grid row under the footprint.
+        """
+        i0, i1 = self._span(x, width, self.cell_x, self.nx)
+        k0, k1 = self._span(z, depth, self.cell_z, self.nz)
+        nz = self.nz
+        for i in range(i0, i1):
+            yield i * nz + k0, i * nz + k1
+
+    def resting_height(self, x: float, z: float, width: float, depth: float) -> float:
+        """
+        Height at which a box with this footprint comes to rest.
+        """
+        heights = self.heights
+        return max(max(heights[a:b]) for a, b in self._rows(x, z, width, depth))
+
+    def support_fraction(self, x: float, y: float, z: float, width: float, depth: float) -> float:
+        """
+        Fraction of the footprint resting on a surface at height y.
+        """
+        heights = self.heights
+        total = supported = 0
+        for a, b in self._rows(x, z, width, depth):
+            total += b - a
+            supported += heights[a:b].count(y)
+        return supported / total
+
+    def supporters(self, x: float, y: float, z: float, width: float, depth: float) -> Dict[int, int]:
+        """
+        {packed item index: supporting cell count} for a footprint resting at
+        height y. Cells on the bin floor carry no item and are left out.
+        """
+        heights, owners = self.heights, self.owners
+        found: Dict[int, int] = {}
+        for a, b in self._rows(x, z, width, depth):
+            for c in range(a, b):
+                if heights[c] == y and owners[c] >= 0:
+                    found[owners[c]] = found.get(owners[c], 0) + 1
+        return found
+
+    def place(self, x: float, y: float, z: float, width: float, height: float, depth: float, owner: int):
+        top = y + height
+        heights, owners = self.heights, self.owners
+        for a, b in self._rows(x, z, width, depth):
+            for c in range(a, b):
+                if top > heights[c]:
+                    heights[c] = top
+                    owners[c] = owner
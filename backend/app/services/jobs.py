@@ -0,0 +1,112 @@
+from ..models.schemas import Bin, PackingRequest
+from .packer import PackingEngine
+from .ems_packer import EMSPackingEngine
+from .sequence_search import SequenceSearch
+from .geometry import Quantizer
+from .stats import PackingCounters
+from .cancellation import CancellationToken, job_token
+from typing import List, Optional, Tuple
+import time
+
+# Compact job format, cheap to pickle between processes:
+#   job    = (bins, items, options)
+#   bins   = [(width, height, depth), ...]
+#   items  = [(width, height, depth, weight, max_stack_weight, quantity, rotation), ...]
+#   (with PackingRequest.resolution set, sizes are integer grid units)
+#   options = (engine, min_support, search_iterations, collect_stats, trace_sample,
+#              cancel_slot, deadline)   (see services/cancellation.py; -1 / None = not cancellable)
+# Result format:
+#   result = (packed_bins, unpacked, stats)
+#   packed_bins = [(efficiency, [(item_index, x, y, z, rotation), ...]), ...]   (positions in job units)
+#   (rotation indexes orientation.ROTATIONS)
+#   unpacked    = [(item_index, units left), ...]
+#   stats       = PackingCounters.to_dict() keyed by item index, or None
+# An item is a SKU group of `quantity` units; its index repeats once per placed unit.
+
+# Share of a job's remaining time kept free after the order search, for the
+# final packing pass and the response
+SEARCH_TIME_MARGIN = 0.25
+
+ENGINES = {
+    "greedy": PackingEngine,
+    "ems": EMSPackingEngine,
+}
+
+
+class JobItem:
+    """
+    Lightweight stand-in for Item inside a packing job.
+    Carries only what the engines read, plus its index in the request.
+    """
+    __slots__ = ("index", "width", "height", "depth", "weight", "max_stack_weight", "quantity", "rotation")
+
+    def __init__(self, index: int, width: float, height: float, depth: float,
+                 weight: Optional[float] = None, max_stack_weight: Optional[float] = None,
+                 quantity: int = 1, rotation: str = "none"):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.weight = weight
+        self.max_stack_weight = max_stack_weight
+        self.quantity = quantity
+        self.rotation = rotation
+
+
+def encode_job(request: PackingRequest, cancel: Optional[CancellationToken] = None) -> tuple:
+    if request.resolution:
+        q = Quantizer(request.resolution)
+        bins = [(q.capacity(b.width), q.capacity(b.height), q.capacity(b.depth)) for b in request.bins]
+        items = [
+            (q.size(i.width), q.size(i.height), q.size(i.depth), i.weight, i.max_stack_weight, i.quantity, i.rotation)
+            for i in request.items
+        ]
+    else:
+        bins = [(b.width, b.height, b.depth) for b in request.bins]
+        items = [
+            (i.width, i.height, i.depth, i.weight, i.max_stack_weight, i.quantity, i.rotation)
+            for i in request.items
+        ]
+    options = (
+        request.engine, request.min_support, request.search_iterations,
+        request.stats or request.trace_sample > 0, request.trace_sample,
+        cancel.slot if cancel is not None else -1,
+        cancel.deadline if cancel is not None else None,
+    )
+    return bins, items, options
+
+
+def run_job(job: tuple) -> Tuple[List[tuple], List[Tuple[int, int]], Optional[dict]]:
+    """
+    Executes a compact packing job. Module-level so it can run in a worker process.
+    Raises JobCancelled if the job's token trips; partial results are discarded.
+    """
+    bins, items, options = job
+    engine_name, min_support, search_iterations, collect_stats, trace_sample, cancel_slot, deadline = options
+
+    bin_models = [Bin(width=w, height=h, depth=d) for w, h, d in bins]
+    job_items = [JobItem(index, *values) for index, values in enumerate(items)]
+
+    engine = ENGINES[engine_name](min_support=min_support)
+    if collect_stats:
+        engine.stats = PackingCounters(trace_sample)
+    engine.cancel = job_token(cancel_slot, deadline)
+    if search_iterations > 0:
+        # Stop searching early enough to return the best order found so far
+        # instead of running into the deadline
+        time_limit = None
+        if deadline is not None:
+            time_limit = max(0.0, (deadline - time.time()) * (1 - SEARCH_TIME_MARGIN))
+        search = SequenceSearch(engine, iterations=search_iterations, time_limit=time_limit)
+        packed_bins, unpacked = search.pack(bin_models, job_items)
+    else:
+        packed_bins, unpacked = engine.pack(bin_models, job_items)
+
+    return (
+        [
+            (b["efficiency"], [(p.item.index, p.x, p.y, p.z, p.rotation) for p in b["placements"]])
+            for b in packed_bins
+        ],
+        [(item.index, count) for item, count in unpacked],
+        engine.stats.to_dict(lambda item: item.index) if collect_stats else None,
+    )
@@ -0,0 +1,162 @@
+from ..models.schemas import Item
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+import codecs
+import csv
+
+DEFAULT_COLOR = "#94a3b8"
+
+# Accepted header spellings, mapped to Item fields
+COLUMN_ALIASES = {
+    "id": "id", "sku": "id",
+    "name": "name", "description": "name",
+    "width": "width", "w": "width",
+    "height": "height", "h": "height",
+    "depth": "depth", "length": "depth", "d": "depth", "l": "depth",
+    "color": "color", "colour": "color",
+    "weight": "weight",
+    "max_stack_weight": "max_stack_weight",
+    "quantity": "quantity", "qty": "quantity", "count": "quantity",
+    "rotation": "rotation", "orientation": "rotation",
+}
+ROTATION_MODES = ("none", "upright", "any")
+REQUIRED_COLUMNS = ("width", "height", "depth")
+
+
+class ManifestError(ValueError):
+    """
+    Raised for unreadable manifests; the message names the offending line.
+    """
+    pass
+
+
+class Manifest:
+    """
+    A manifest collapsed into SKU groups while it is read.
+    Rows with the same id (when the manifest has one), name, dimensions,
+    color, weights and rotation are merged, so memory grows with the number
+    of distinct SKUs, not with the file size. An id may not be reused for
+    a different item.
+    """
+    def __init__(self, max_groups: int):
+        self.max_groups = max_groups
+        self.items: List[Item] = []
+        self._groups: Dict[tuple, int] = {}
+        self._ids: Dict[str, tuple] = {}
+
+    def add(self, line: int, row: Dict[str, object]):
+        try:
+            width, height, depth = (float(row[c]) for c in REQUIRED_COLUMNS)
+            weight = _optional_float(row.get("weight"))
+            max_stack_weight = _optional_float(row.get("max_stack_weight"))
+            quantity = _optional_float(row.get("quantity"))
+            quantity = 1.0 if quantity is None else quantity
+        except (TypeError, ValueError):
+            raise ManifestError(f"Line {line}: dimensions, weights and quantity must be numbers")
+        if not quantity.is_integer():
+            raise ManifestError(f"Line {line}: quantity must be a whole number")
+        quantity = int(quantity)
+        if width <= 0 or height <= 0 or depth <= 0 or quantity < 0:
+            raise ManifestError(f"Line {line}: dimensions must be positive and quantity non-negative")
+        if quantity == 0:
+            return
+
+        rotation = str(row.get("rotation") or "none").strip().lower()
+        if rotation not in ROTATION_MODES:
+            raise ManifestError(f"Line {line}: rotation must be one of {', '.join(ROTATION_MODES)}")
+
+        item_id = _text(row.get("id"))
+        name = _text(row.get("name")) or item_id or f"Item {line}"
+        color = _text(row.get("color")) or DEFAULT_COLOR
+        key = (item_id, name, width, height, depth, color, weight, max_stack_weight, rotation)
+
+        index = self._groups.get(key)
+        if index is not None:
+            self.items[index].quantity += quantity
+            return
+
+        if item_id:
+            if item_id in self._ids:
+                raise ManifestError(f"Line {line}: id '{item_id}' was already used for a different item")
+            self._ids[item_id] = key
+        if len(self.items) >= self.max_groups:
+            raise ManifestError(f"Line {line}: more than {self.max_groups} distinct items")
+        self._groups[key] = len(self.items)
+        self.items.append(Item(
+            id=item_id or f"L{line}",
+            name=name,
+            width=width,
+            height=height,
+            depth=depth,
+            color=color,
+            weight=weight,
+            max_stack_weight=max_stack_weight,
+            quantity=quantity,
+            rotation=rotation,
+        ))
+
+
+def read_manifest(file: BinaryIO, filename: str, max_groups: int) -> Manifest:
+    """
+    Streams a CSV or XLSX manifest row by row into a grouped Manifest.
+    """
+    manifest = Manifest(max_groups)
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        rows = _xlsx_rows(file)
+    elif name.endswith(".csv") or name.endswith(".txt") or not name:
+        rows = _csv_rows(file)
+    else:
+        raise ManifestError("Unsupported manifest format: upload a .csv or .xlsx file")
+
+    header: Optional[List[Optional[str]]] = None
+    for line, values in rows:
+        if not any(v not in (None, "") for v in values):
+            continue
+        if header is None:
+            header = [COLUMN_ALIASES.get(str(v).strip().lower()) if v is not None else None for v in values]
+            missing = [c for c in REQUIRED_COLUMNS if c not in header]
+            if missing:
+                raise ManifestError(f"Line {line}: missing column(s) {', '.join(missing)}")
+            continue
+        row = {field: value for field, value in zip(header, values) if field is not None}
+        manifest.add(line, row)
+
+    if header is None:
+        raise ManifestError("Manifest is empty")
+    return manifest
+
+
+def _text(value) -> str:
+    # Spreadsheet cells may hold numbers: SKU 100 must not become "100.0"
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip() if value is not None else ""
+
+
+def _optional_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[Tuple[int, list]]:
+    # Decode incrementally; utf-8-sig drops the BOM that spreadsheet exports add
+    text = codecs.iterdecode(file, "utf-8-sig")
+    for line, values in enumerate(csv.reader(text), start=1):
+        yield line, values
+
+
+def _xlsx_rows(file: BinaryIO) -> Iterator[Tuple[int, tuple]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ManifestError("XLSX manifests need the 'openpyxl' package; upload a .csv instead")
+
+    # read_only mode streams rows instead of loading the whole sheet
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        for line, values in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield line, values
+    finally:
+        workbook.close()
@@ -0,0 +1,48 @@
+from typing import Iterable, List, Tuple
+
+# Axis permutations: an oriented box has (width, height, depth) =
+# (dims[p[0]], dims[p[1]], dims[p[2]]) for the original (width, height, depth)
+ROTATIONS = (
+    (0, 1, 2),  # as given
+    (2, 1, 0),  # turned about the vertical axis
+    (1, 0, 2),
+    (1, 2, 0),
+    (0, 2, 1),
+    (2, 0, 1),
+)
+
+# Rotations each Item.rotation mode allows; the first two keep the top face up
+ALLOWED_ROTATIONS = {
+    "none": (0,),
+    "upright": (0, 1),
+    "any": tuple(range(len(ROTATIONS))),
+}
+
+# An orientation as (width, height, depth, rotation index)
+Orientation = Tuple[float, float, float, int]
+
+
+def rotate(dims: Tuple[float, float, float], rotation: int) -> Tuple[float, float, float]:
+    p = ROTATIONS[rotation]
+    return dims[p[0]], dims[p[1]], dims[p[2]]
+
+
+def orientation_table(item, bins: Iterable = None) -> List[Orientation]:
+    """
+    Distinct orientations the item may be placed in, in preference order.
+    Orientations with the same dimensions (cubes, square faces) are kept
+    once, and ones that fit no bin are dropped.
+    """
+    dims = (item.width, item.height, item.depth)
+    bins = list(bins) if bins is not None else None
+    table: List[Orientation] = []
+    seen = set()
+    for rotation in ALLOWED_ROTATIONS[item.rotation]:
+        w, h, d = rotate(dims, rotation)
+        if (w, h, d) in seen:
+            continue
+        seen.add((w, h, d))
+        if bins is not None and not any(w <= b.width and h <= b.height and d <= b.depth for b in bins):
+            continue
+        table.append((w, h, d, rotation))
+    return table
@@ -1,106 +1,429 @@
 from ..models.schemas import Item, Bin
-from typing import List, Tuple
+from .height_map import HeightMap
+from .stats import PackingCounters
+from .cancellation import CancellationToken
+from .orientation import Orientation, orientation_table
+from typing import Dict, List, Optional, Tuple
+import copy
+import time
+
+# Slack allowed when comparing accumulated loads against a stacking limit
+LOAD_TOLERANCE = 1e-9
+
+
+class Placement:
+    """
+    A box placed inside a bin.
+    Keeps positions out of the request's Item objects while packing,
+    so the same Item can sit at different spots in different candidate plans.
+    width/height/depth are the placed (possibly rotated) dimensions.
+    """
+    __slots__ = ("item", "x", "y", "z", "width", "height", "depth", "rotation")
+
+    def __init__(self, item: Item, x: float, y: float, z: float,
+                 width: float = None, height: float = None, depth: float = None, rotation: int = 0):
+        self.item = item
+        self.x = x
+        self.y = y
+        self.z = z
+        self.width = item.width if width is None else width
+        self.height = item.height if height is None else height
+        self.depth = item.depth if depth is None else depth
+        self.rotation = rotation  # Index into orientation.ROTATIONS
+
+
+class BinState:
+    """
+    Placement state of a single bin.
+    Detached from the engine so a packing run can be paused, copied and resumed.
+    """
+    def __init__(self, bin_dims: Bin):
+        self.bin = bin_dims
+        self.index = 0  # Position of the bin in the request
+        self.packed_items: List[Placement] = []
+        # Support tracking (only when the engine needs it)
+        self.height_map: Optional[HeightMap] = None
+        # Set while another state (a cached snapshot) uses the same height map
+        self.height_map_shared = False
+        self.supports: List[List[Tuple[int, float]]] = []  # per placement: (supporter index, share)
+        self.loads: List[float] = []  # per placement: weight resting on top of it
+
+    def copy(self, share_height_map: bool = False) -> "BinState":
+        """
+        Independent copy of the state. With share_height_map both states
+        keep the same height map (the bulk of their memory) and whichever is
+        written first copies it then (see PackingEngine._place), so saving
+        and resuming a state costs no more than its placement lists.
+        """
+        # Placements are never mutated once placed, so a shallow list copy is enough
+        clone = copy.copy(self)
+        clone.packed_items = self.packed_items[:]
+        clone.supports = self.supports[:]
+        clone.loads = self.loads[:]
+        if self.height_map is not None:
+            if share_height_map:
+                self.height_map_shared = clone.height_map_shared = True
+            else:
+                clone.height_map = self.height_map.copy()
+                clone.height_map_shared = False
+        return clone
+
+    def size(self) -> int:
+        """
+        Rough memory footprint in list slots, for bounding caches of states.
+        """
+        slots = 2 * len(self.packed_items)
+        if self.height_map is not None:
+            slots += len(self.height_map.heights) * 2
+        return slots
+
 
 class PackingEngine:
     """
     Object-Oriented 3D Bin Packing Engine.
     Uses a Greedy heuristic with space management.
+
+    With min_support > 0 every box must rest on a surface covering at least
+    that fraction of its base, and boxes with a max_stack_weight never carry
+    more than that. Both are answered from a per-bin HeightMap.
+
+    Items may be rotated as their `rotation` allows; the distinct orientations
+    of every SKU are computed once per run (see services/orientation.py).
     """
-    def __init__(self):
+    state_class = BinState
+
+    def __init__(self, min_support: float = 0.0, max_height_map_cells: int = 128):
         self.bin_width = 0
         self.bin_height = 0
         self.bin_depth = 0
-        self.packed_items: List[Item] = []
-        
-    def pack(self, bins: List[Bin], items: List[Item]) -> Tuple[List[dict], List[Item]]:
+        self.packed_items: List[Placement] = []
+        self.state: BinState = None
+        self.min_support = min_support
+        self.max_height_map_cells = max_height_map_cells
+        self.height_map_cell_size = 1.0
+        self.track_support = min_support > 0
+        self.height_map: Optional[HeightMap] = None
+        # id(item) -> allowed orientations, built in prepare()
+        self.orientations: Dict[int, List[Orientation]] = {}
+        # Optional profiling counters (see services/stats.py)
+        self.stats: Optional[PackingCounters] = None
+        # Optional cooperative cancellation, checked between units and bins
+        self.cancel: Optional[CancellationToken] = None
+
+    def pack(self, bins: List[Bin], items: List[Item]) -> Tuple[List[dict], List[Tuple[Item, int]]]:
         """
         Main packing method for multiple bins.
-        Returns (packed_bins, unpacked_items)
+        Returns (packed_bins, unpacked) where unpacked is [(item, units left)]
         """
         # Sort items by volume (Descending) for better efficiency
         sorted_items = sorted(
-            items, 
-            key=lambda i: i.width * i.height * i.depth, 
+            items,
+            key=lambda i: i.width * i.height * i.depth,
             reverse=True
         )
-        
+        return self.pack_sequence(bins, sorted_items)
+
+    def pack_sequence(self, bins: List[Bin], items: List[Item]) -> Tuple[List[dict], List[Tuple[Item, int]]]:
+        """
+        Packs items in exactly the given order (no sorting).
+        Each item is a SKU group of `quantity` identical units; placements
+        reference the group item and are only expanded at the response boundary.
+        Returns (packed_bins, unpacked) where unpacked is [(item, units left)]
+        """
+        self.prepare(items, bins)
         packed_bins_result = []
-        current_items_to_pack = sorted_items[:]
-        
+        current_items_to_pack = [(item, item.quantity) for item in items]
+
         for idx, bin_dims in enumerate(bins):
             if not current_items_to_pack:
                 break
-                
-            self.bin_width = bin_dims.width
-            self.bin_height = bin_dims.height
-            self.bin_depth = bin_dims.depth
-            self.packed_items = []
-            
-            # Temporary list for items that didn't fit in THIS bin
+            if self.cancel is not None:
+                self.cancel.check()
+
+            started = time.perf_counter()
+            self.bind_state(self.new_state(bin_dims, idx))
+
+            # Temporary list for units that didn't fit in THIS bin
             unpacked_in_this_bin = []
-            
-            for item in current_items_to_pack:
-                position = self._find_best_position(item)
-                if position:
-                    item.x, item.y, item.z = position
-                    self.packed_items.append(item)
-                else:
-                    unpacked_in_this_bin.append(item)
-            
+
+            for item, count in current_items_to_pack:
+                placed = self.place_units(item, count)
+                if placed < count:
+                    unpacked_in_this_bin.append((item, count - placed))
+
             # Calculate efficiency for this bin
             bin_vol = self.bin_width * self.bin_height * self.bin_depth
-            used_vol = sum(i.width * i.height * i.depth for i in self.packed_items)
+            used_vol = sum(p.width * p.height * p.depth for p in self.packed_items)
             efficiency = (used_vol / bin_vol) * 100 if bin_vol > 0 else 0
-            
+
             packed_bins_result.append({
                 "bin_id": f"Bin {idx + 1}",
-                "packed_items": self.packed_items[:], # Copy list
+                "placements": self.packed_items[:], # Copy list
                 "efficiency": round(efficiency, 2)
             })
-            
+            if self.stats is not None:
+                self.stats.bin_seconds.append(time.perf_counter() - started)
+
             # Update items for next bin
-            current_items_to_pack = unpacked_in_this_bin[:]
-            
+            current_items_to_pack = unpacked_in_this_bin
+
         return packed_bins_result, current_items_to_pack
 
+    def prepare(self, items: List[Item], bins: Optional[List[Bin]] = None):
+        """
+        Hook for per-manifest precomputation, run once before placing items.
+        """
+        self.orientations = {id(item): orientation_table(item, bins) for item in items}
+
+        # Load limits need to know who supports whom, even without a stability rule
+        self.track_support = self.min_support > 0 or any(
+            i.max_stack_weight is not None for i in items
+        )
+        if self.track_support:
+            # A quarter of the smallest footprint side keeps every box several cells wide
+            smallest = min((min(w, d) for table in self.orientations.values() for w, _, d, _ in table), default=4)
+            self.height_map_cell_size = smallest / 4
+
+    def new_state(self, bin_dims: Bin, index: int = 0) -> BinState:
+        state = self.state_class(bin_dims)
+        state.index = index
+        if self.track_support:
+            state.height_map = self._new_height_map(bin_dims)
+        return state
+
+    def resume_state(self, saved: BinState) -> BinState:
+        """
+        Working copy of a saved state; it shares the saved height map until
+        its first placement.
+        """
+        return saved.copy(share_height_map=True)
+
+    def _new_height_map(self, bin_dims: Bin) -> HeightMap:
+        return HeightMap(
+            bin_dims.width, bin_dims.depth,
+            self.height_map_cell_size, self.max_height_map_cells
+        )
+
+    def bind_state(self, state: BinState):
+        """
+        Points the engine at a bin's state. Placements go straight into it.
+        """
+        self.state = state
+        self.bin_width = state.bin.width
+        self.bin_height = state.bin.height
+        self.bin_depth = state.bin.depth
+        self.packed_items = state.packed_items
+        self.height_map = state.height_map
+
+    def try_place(self, item: Item) -> bool:
+        """
+        Places the item into the bound bin if a position exists.
+        """
+        stats = self.stats
+        if stats is not None:
+            tested_before = stats.candidates_tested
+        position = self._find_best_position(item)
+        if stats is not None:
+            stats.record_attempt(
+                item, self.state.index, position and position[:3], stats.candidates_tested - tested_before
+            )
+        if position is None:
+            return False
+        self._place(item, position)
+        return True
+
+    def place_units(self, item: Item, count: int) -> int:
+        """
+        Places up to `count` units of the item into the bound bin.
+        Once a unit fails the bin is unchanged, so the identical units
+        after it would fail too: stop there.
+        Raises JobCancelled between units once the cancel token trips.
+        """
+        cancel = self.cancel
+        placed = 0
+        while placed < count:
+            if cancel is not None:
+                cancel.check()
+            if not self.try_place(item):
+                break
+            placed += 1
+        return placed
+
+    def _place(self, item: Item, position: Tuple[float, float, float, Orientation]):
+        x, y, z, (w, h, d, rotation) = position
+        if self.height_map is not None:
+            index = len(self.packed_items)
+            shares = self._support_shares(x, y, z, w, d)
+            for below, load in self._load_increments(item, shares).items():
+                self.state.loads[below] += load
+            self.state.supports.append(list(shares.items()))
+            self.state.loads.append(0.0)
+            if self.state.height_map_shared:
+                self.height_map = self.state.height_map = self.height_map.copy()
+                self.state.height_map_shared = False
+            self.height_map.place(x, y, z, w, h, d, index)
+        self.packed_items.append(Placement(item, x, y, z, w, h, d, rotation))
+
+    def _support_shares(self, x, y, z, width, depth) -> Dict[int, float]:
+        """
+        Fraction of the weight of a box with this footprint carried by each
+        packed item directly below.
+        """
+        supporters = self.height_map.supporters(x, y, z, width, depth)
+        total = sum(supporters.values())
+        return {index: count / total for index, count in supporters.items()}
+
+    def _load_increments(self, item: Item, shares: Dict[int, float]) -> Dict[int, float]:
+        """
+        Extra load every packed item would carry if `item` were placed,
+        pushed down the support graph in proportion to contact area.
+        """
+        increments: Dict[int, float] = {}
+        if not item.weight:
+            return increments
+        pending = [(index, item.weight * share) for index, share in shares.items()]
+        supports = self.state.supports
+        while pending:
+            index, load = pending.pop()
+            increments[index] = increments.get(index, 0.0) + load
+            for below, share in supports[index]:
+                pending.append((below, load * share))
+        return increments
+
+    def _is_stable(self, item: Item, x, y, z, width, depth) -> bool:
+        """
+        Checks base support and the stacking limits of everything underneath,
+        for the item resting with a width x depth footprint.
+        """
+        if self.height_map is None:
+            return True
+        if self.stats is not None:
+            self.stats.support_checks += 1
+        if self.min_support > 0:
+            fraction = self.height_map.support_fraction(x, y, z, width, depth)
+            if fraction < self.min_support:
+                return False
+        if not item.weight or y == 0:
+            return True
+
+        shares = self._support_shares(x, y, z, width, depth)
+        loads = self.state.loads
+        for index, load in self._load_increments(item, shares).items():
+            limit = self.packed_items[index].item.max_stack_weight
+            if limit is not None and loads[index] + load > limit + LOAD_TOLERANCE:
+                return False
+        return True
+
     def _find_best_position(self, item: Item):
         """
         Finds the first valid position (Greedy) for the item.
         Strategically checks (0,0,0) and corners of existing items.
+        Returns (x, y, z, orientation) or None.
         """
-        # Potential pivot points
-        candidates = [(0, 0, 0)]
+        orientations = self.orientations.get(id(item))
+        if orientations is None:
+            orientations = self.orientations[id(item)] = orientation_table(item)
+        if not orientations:
+            return None
+
+        # Potential pivot points (a set: corners shared by neighbours are tested once;
+        # exact on integer grid geometry, see services/geometry.py)
+        candidates = {(0, 0, 0)}
         for other in self.packed_items:
             # Add points adjacent to existing items
-            candidates.append((other.x + other.width, other.y, other.z))
-            candidates.append((other.x, other.y + other.height, other.z))
-            candidates.append((other.x, other.y, other.z + other.depth))
-            
+            candidates.add((other.x + other.width, other.y, other.z))
+            candidates.add((other.x, other.y + other.height, other.z))
+            candidates.add((other.x, other.y, other.z + other.depth))
+
         # Optimize search: Sort candidates by proximity to origin (0,0,0)
-        # This keeps the packing dense towards the corner
-        candidates.sort(key=lambda p: p[0]**2 + p[1]**2 + p[2]**2)
-        
+        # This keeps the packing dense towards the corner (ties broken by coordinates)
+        candidates = sorted(candidates, key=lambda p: (p[0]**2 + p[1]**2 + p[2]**2, p))
+
+        stats = self.stats
+        if stats is not None:
+            stats.candidates_generated += len(candidates)
+
+        height_map = self.height_map
+        bin_width, bin_height, bin_depth = self.bin_width, self.bin_height, self.bin_depth
         for x, y, z in candidates:
-            if self._can_fit(item, x, y, z):
-                return (x, y, z)
+            if stats is not None:
+                stats.candidates_tested += 1
+            # Every orientation that fits the bin here, with the height it would rest at
+            inside = [o for o in orientations if x + o[0] <= bin_width and z + o[2] <= bin_depth]
+            if not inside:
+                continue
+            if height_map is not None:
+                if len(inside) > 1:
+                    # Every footprint covers the smallest one at this corner: one lookup
+                    # rejects all orientations when it already rises above y
+                    floor = height_map.resting_height(
+                        x, z, min(o[0] for o in inside), min(o[2] for o in inside)
+                    )
+                    if floor > y:
+                        continue
+                # Let the box drop onto whatever surface lies under its footprint
+                options = []
+                for o in inside:
+                    rest = height_map.resting_height(x, z, o[0], o[2])
+                    if rest <= y and rest + o[1] <= bin_height:
+                        options.append((rest, o))
+            else:
+                options = [(y, o) for o in inside if y + o[1] <= bin_height]
+            if not options:
+                continue
+
+            for rest, orientation in self._collision_free(x, z, options):
+                if self._is_stable(item, x, rest, z, orientation[0], orientation[2]):
+                    return (x, rest, z, orientation)
         return None
 
-    def _can_fit(self, item: Item, x: float, y: float, z: float) -> bool:
-        # Check Bin Boundaries
-        if (x + item.width > self.bin_width or 
-            y + item.height > self.bin_height or 
-            z + item.depth > self.bin_depth):
-            return False
-            
-        # Check Collisions
+    def _collision_free(self, x, z, options: List[Tuple[float, Orientation]]) -> List[Tuple[float, Orientation]]:
+        """
+        Filters (y, orientation) options at (x, z) down to those overlapping no
+        packed box, testing all orientations in a single scan: a packed box
+        that misses the bounding box of every option is skipped with one test.
+        """
+        x2 = x + max(o[0] for _, o in options)
+        z2 = z + max(o[2] for _, o in options)
+        y1 = min(y for y, _ in options)
+        y2 = max(y + o[1] for y, o in options)
+        if self.stats is not None:
+            return self._collision_free_counted(x, z, options, x2, y1, y2, z2)
         for other in self.packed_items:
-            if self._intersect(item, x, y, z, other):
-                return False
-        return True
+            if not (x < other.x + other.width and x2 > other.x and
+                    y1 < other.y + other.height and y2 > other.y and
+                    z < other.z + other.depth and z2 > other.z):
+                continue
+            options = [
+                (y, o) for y, o in options
+                if not self._intersect(x, y, z, o[0], o[1], o[2], other)
+            ]
+            if not options:
+                break
+        return options
 
-    def _intersect(self, item: Item, x, y, z, other: Item) -> bool:
+    def _collision_free_counted(self, x, z, options, x2, y1, y2, z2) -> List[Tuple[float, Orientation]]:
+        # Same scan as _collision_free, counting _intersect calls (kept apart so
+        # the uncounted loop stays as lean as possible)
+        checked = 0
+        for other in self.packed_items:
+            if not (x < other.x + other.width and x2 > other.x and
+                    y1 < other.y + other.height and y2 > other.y and
+                    z < other.z + other.depth and z2 > other.z):
+                continue
+            checked += len(options)
+            options = [
+                (y, o) for y, o in options
+                if not self._intersect(x, y, z, o[0], o[1], o[2], other)
+            ]
+            if not options:
+                break
+        self.stats.intersect_calls += checked
+        return options
+
+    def _intersect(self, x, y, z, width, height, depth, other: Placement) -> bool:
         return (
-            x < other.x + other.width and x + item.width > other.x and
-            y < other.y + other.height and y + item.height > other.y and
-            z < other.z + other.depth and z + item.depth > other.z
-        )
\ No newline at end of file
+            x < other.x + other.width and x + width > other.x and
+            y < other.y + other.height and y + height > other.y and
+            z < other.z + other.depth and z + depth > other.z
+        )
@@ -0,0 +1,208 @@
+from ..models.schemas import Item, Bin
+from .packer import PackingEngine, BinState
+from collections import OrderedDict
+from typing import List, Tuple, Optional
+import math
+import random
+import time
+
+
+class _Snapshot:
+    """
+    Packing state after a sequence prefix: one BinState per opened bin
+    plus the packed volume reached so far. States share their height maps
+    with the run that saved them (see BinState.copy); `size` still counts
+    every map in full, so the cache bound errs on the safe side.
+    """
+    __slots__ = ("states", "volume", "size")
+
+    def __init__(self, states: List[Optional[BinState]], volume: float):
+        self.states = states
+        self.volume = volume
+        self.size = sum(s.size() for s in states if s is not None) + 1
+
+
+class PrefixStateCache:
+    """
+    LRU cache of intermediate packing states keyed by sequence prefix.
+    Only every `stride`-th prefix is stored; entries are evicted once there
+    are more than `capacity` of them or their estimated size (in list slots,
+    see BinState.size) exceeds `max_size`.
+    A lookup falls back to the closest stored prefix below the requested length.
+    """
+    def __init__(self, capacity: int = 2048, stride: int = 8, max_size: int = 2_000_000):
+        self.capacity = capacity
+        self.stride = max(1, stride)
+        self.max_size = max_size
+        self.size = 0
+        self._entries: "OrderedDict[tuple, _Snapshot]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, sequence: List[int], limit: int) -> Tuple[int, Optional[_Snapshot]]:
+        """
+        Returns (prefix_length, snapshot) for the longest cached prefix of
+        `sequence` not longer than `limit`, or (0, None).
+        """
+        start = (limit // self.stride) * self.stride
+        for length in range(start, 0, -self.stride):
+            key = tuple(sequence[:length])
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return length, snapshot
+        self.misses += 1
+        return 0, None
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def store(self, prefix: tuple, snapshot: _Snapshot):
+        previous = self._entries.pop(prefix, None)
+        if previous is not None:
+            self.size -= previous.size
+        self._entries[prefix] = snapshot
+        self.size += snapshot.size
+        while len(self._entries) > 1 and (len(self._entries) > self.capacity or self.size > self.max_size):
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+
+class SequenceSearch:
+    """
+    Simulated annealing over the item insertion order.
+    Starts from the volume-sorted order used by PackingEngine.pack and
+    mutates it by swapping two positions. Each candidate is evaluated by
+    replaying the greedy placement only from the first changed position,
+    resuming from a cached state of the unchanged prefix.
+
+    That replay is the cost of an evaluation, so the first position of a
+    swap is drawn towards the end of the order: with `position_bias` b it
+    lies in the last fraction f of the order with probability f^(1/b)
+    (b=1 is uniform). The second position is uniform after the first.
+    """
+    def __init__(
+        self,
+        engine: PackingEngine = None,
+        iterations: int = 1000,
+        time_limit: Optional[float] = None,
+        initial_temperature: float = 0.02,
+        final_temperature: float = 0.0001,
+        position_bias: float = 3.0,
+        cache: PrefixStateCache = None,
+        seed: Optional[int] = None,
+    ):
+        self.engine = engine or PackingEngine()
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+        self.position_bias = position_bias
+        self.cache = cache or PrefixStateCache()
+        self.random = random.Random(seed)
+        self.evaluations = 0
+
+    def pack(self, bins: List[Bin], items: List[Item]) -> Tuple[List[dict], List[Tuple[Item, int]]]:
+        """
+        Same contract as PackingEngine.pack, but packs in the best order found.
+        """
+        if len(items) < 2 or not bins:
+            return self.engine.pack(bins, items)
+
+        best_order = self.search(bins, items)
+        if self.engine.stats is not None:
+            # Placement counters describe the returned plan, not every replay
+            self.engine.stats.reset()
+            self.engine.stats.search_evaluations += self.evaluations
+            self.engine.stats.cache_hits += self.cache.hits
+            self.engine.stats.cache_misses += self.cache.misses
+        return self.engine.pack_sequence(bins, [items[i] for i in best_order])
+
+    def search(self, bins: List[Bin], items: List[Item]) -> List[int]:
+        """
+        Returns the best item order found, as indices into `items`.
+        """
+        # Prefix keys are item indices, so they are only valid for one manifest
+        self.cache.clear()
+        self.engine.prepare(items, bins)
+        self._bins = bins
+        self._items = items
+        self._volumes = [i.width * i.height * i.depth for i in items]
+        total_volume = sum(v * i.quantity for v, i in zip(self._volumes, items)) or 1.0
+
+        n = len(items)
+        current = sorted(range(n), key=lambda i: self._volumes[i], reverse=True)
+        current_score = self._evaluate(current, 0) / total_volume
+        best, best_score = current[:], current_score
+
+        cooling = (self.final_temperature / self.initial_temperature) ** (1.0 / max(1, self.iterations))
+        temperature = self.initial_temperature
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+
+        for _ in range(self.iterations):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            if self.engine.cancel is not None:
+                self.engine.cancel.check()
+
+            i = n - 2 - int((n - 1) * self.random.random() ** self.position_bias)
+            j = self.random.randint(i + 1, n - 1)
+            candidate = current[:]
+            candidate[i], candidate[j] = candidate[j], candidate[i]
+
+            score = self._evaluate(candidate, i) / total_volume
+            delta = score - current_score
+            if delta >= 0 or self.random.random() < math.exp(delta / temperature):
+                current, current_score = candidate, score
+                if current_score > best_score:
+                    best, best_score = current[:], current_score
+
+            temperature *= cooling
+
+        return best
+
+    def _evaluate(self, sequence: List[int], changed_from: int) -> float:
+        """
+        Packed volume for `sequence`, replaying placements from the longest
+        cached prefix that ends at or before `changed_from`.
+        """
+        self.evaluations += 1
+        engine = self.engine
+        bins = self._bins
+        stride = self.cache.stride
+
+        start, snapshot = self.cache.lookup(sequence, changed_from)
+        if snapshot is not None:
+            # Cached states are shared, so work on copies
+            states = [engine.resume_state(s) if s is not None else None for s in snapshot.states]
+            volume = snapshot.volume
+        else:
+            states = [None] * len(bins)
+            volume = 0.0
+
+        # Item-major first-fit: a SKU group fills bins in order, which gives the
+        # same per-bin placements as the bin-by-bin loop in pack_sequence
+        for position in range(start, len(sequence)):
+            index = sequence[position]
+            item = self._items[index]
+            remaining = item.quantity
+            for b, bin_dims in enumerate(bins):
+                if states[b] is None:
+                    states[b] = engine.new_state(bin_dims, b)
+                engine.bind_state(states[b])
+                placed = engine.place_units(item, remaining)
+                volume += placed * self._volumes[index]
+                remaining -= placed
+                if not remaining:
+                    break
+
+            done = position + 1
+            if done % stride == 0 and done < len(sequence):
+                self.cache.store(
+                    tuple(sequence[:done]),
+                    _Snapshot([s.copy(share_height_map=True) if s is not None else None for s in states], volume)
+                )
+
+        return volume
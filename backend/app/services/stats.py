@@ -0,0 +1,76 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bound on trace entries kept per run
+MAX_TRACE_ENTRIES = 500
+
+
+class PackingCounters:
+    """
+    Cheap algorithm-level counters for one packing run.
+    Engines only touch them when one is attached (engine.stats), so a run
+    without counters pays a single `is not None` check per hot-path call.
+    """
+    __slots__ = (
+        "candidates_generated", "candidates_tested", "intersect_calls", "support_checks",
+        "placements", "fit_failures", "bin_seconds", "search_evaluations",
+        "cache_hits", "cache_misses", "trace_every", "trace", "_attempts",
+    )
+
+    def __init__(self, trace_every: int = 0):
+        self.search_evaluations = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Sampled per-item trace: every `trace_every`-th placement attempt (0 = off)
+        self.trace_every = trace_every
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the placement counters and trace, keeping the search counters,
+        so a run that searched first reports only its final packing pass.
+        """
+        self.candidates_generated = 0
+        self.candidates_tested = 0
+        self.intersect_calls = 0
+        self.support_checks = 0
+        self.placements = 0
+        # id(item) -> [item, failed attempts]; request Items are not hashable
+        self.fit_failures: Dict[int, list] = {}
+        self.bin_seconds: List[float] = []
+        self.trace: List[Tuple[object, int, Optional[tuple], int]] = []
+        self._attempts = 0
+
+    def record_attempt(self, item, bin_index: int, position: Optional[tuple], tested: int):
+        if position is None:
+            entry = self.fit_failures.get(id(item))
+            if entry is None:
+                self.fit_failures[id(item)] = [item, 1]
+            else:
+                entry[1] += 1
+        else:
+            self.placements += 1
+        if self.trace_every:
+            self._attempts += 1
+            if self._attempts % self.trace_every == 0 and len(self.trace) < MAX_TRACE_ENTRIES:
+                self.trace.append((item, bin_index, position, tested))
+
+    def to_dict(self, item_key: Callable[[object], object]) -> dict:
+        """
+        Plain, picklable summary; items are replaced by item_key(item).
+        """
+        return {
+            "candidates_generated": self.candidates_generated,
+            "candidates_tested": self.candidates_tested,
+            "intersect_calls": self.intersect_calls,
+            "support_checks": self.support_checks,
+            "placements": self.placements,
+            "fit_failures": {item_key(item): n for item, n in self.fit_failures.values()},
+            "bin_seconds": [round(s, 6) for s in self.bin_seconds],
+            "search_evaluations": self.search_evaluations,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "trace": [
+                (item_key(item), bin_index, list(position) if position else None, tested)
+                for item, bin_index, position, tested in self.trace
+            ],
+        }
@@ -0,0 +1,34 @@
+from typing import List
+import json
+
+
+def load_json(value, default=None):
+    """
+    Decodes a JSON column. Runs are stored as json.dumps strings, but a
+    column may also hand back an already decoded value.
+    """
+    if value is None or value == "":
+        return [] if default is None else default
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value
+
+
+def packed_bins(record) -> List[dict]:
+    """
+    Packed bins of a stored run in the grouped form of StoredBin.
+    Runs stored before SKU quantities kept a flat list of placed items with
+    no bin boundaries; such a list is read as a single bin holding them all.
+    """
+    stored = load_json(record.packed_items_json)
+    if not stored or "placements" in stored[0]:
+        return stored
+
+    groups = {}
+    for item in stored:
+        groups.setdefault(item["id"], []).append([item.get("x") or 0, item.get("y") or 0, item.get("z") or 0])
+    return [{
+        "bin_id": "Bin 1",
+        "efficiency": record.efficiency or 0,
+        "placements": [{"item_id": item_id, "positions": positions} for item_id, positions in groups.items()],
+    }]
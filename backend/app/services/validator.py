@@ -0,0 +1,92 @@
+from ..models.schemas import Bin, Item
+from typing import Dict, List, Tuple
+import math
+
+# Overlaps / overhangs smaller than this are treated as touching (client-side rounding)
+TOLERANCE = 1e-6
+
+# Upper bound on reported overlap pairs per bin, so a wildly broken plan stays cheap to answer
+MAX_REPORTED_OVERLAPS = 1000
+
+
+def find_out_of_bounds(bin_dims: Bin, items: List[Item]) -> List[int]:
+    """
+    Indices of items that stick out of the bin.
+    """
+    return [
+        index for index, item in enumerate(items)
+        if (item.x < -TOLERANCE or item.y < -TOLERANCE or item.z < -TOLERANCE or
+            item.x + item.width > bin_dims.width + TOLERANCE or
+            item.y + item.height > bin_dims.height + TOLERANCE or
+            item.z + item.depth > bin_dims.depth + TOLERANCE)
+    ]
+
+
+def find_overlaps(items: List[Item], limit: int = MAX_REPORTED_OVERLAPS) -> Tuple[List[Tuple[int, int]], bool]:
+    """
+    Uniform grid hashing: space is cut into cells about the size of a typical
+    box and every box is registered in the cells it covers. A box is only
+    tested against the boxes sharing one of its cells, so a packed bin costs
+    about O(n) tests however it is stacked, where a sweep along one axis
+    degrades to O(n^2) on a wall of boxes sharing that axis' extent.
+    Returns (pairs of item indices, truncated); truncated means there are
+    overlaps beyond the `limit` reported ones.
+    """
+    if len(items) < 2:
+        return [], False
+
+    axes = [
+        _grid_axis([item.x for item in items], [item.width for item in items], len(items)),
+        _grid_axis([item.y for item in items], [item.height for item in items], len(items)),
+        _grid_axis([item.z for item in items], [item.depth for item in items], len(items)),
+    ]
+    grid: Dict[Tuple[int, int, int], List[int]] = {}
+    pairs: List[Tuple[int, int]] = []
+
+    for index, box in enumerate(items):
+        x1, y1, z1 = box.x, box.y, box.z
+        x2, y2, z2 = x1 + box.width, y1 + box.height, z1 + box.depth
+        cells = [
+            (i, j, k)
+            for i in _cell_range(axes[0], x1, x2)
+            for j in _cell_range(axes[1], y1, y2)
+            for k in _cell_range(axes[2], z1, z2)
+        ]
+        candidates = set()
+        for cell in cells:
+            candidates.update(grid.get(cell, ()))
+
+        for other_index in sorted(candidates):
+            other = items[other_index]
+            if (x1 < other.x + other.width - TOLERANCE and other.x < x2 - TOLERANCE and
+                y1 < other.y + other.height - TOLERANCE and other.y < y2 - TOLERANCE and
+                z1 < other.z + other.depth - TOLERANCE and other.z < z2 - TOLERANCE):
+                if len(pairs) >= limit:
+                    return pairs, True
+                pairs.append((other_index, index))
+
+        for cell in cells:
+            grid.setdefault(cell, []).append(index)
+
+    return pairs, False
+
+
+def _grid_axis(starts: List[float], sizes: List[float], count: int) -> Tuple[float, float]:
+    """
+    (origin, cell size) along one axis. Cells follow the median box size,
+    but there are never more than about 2 * cbrt(n) of them, so one huge box
+    cannot cover a cell count out of proportion to the plan.
+    """
+    origin = min(starts)
+    span = max(start + size for start, size in zip(starts, sizes)) - origin
+    median = sorted(sizes)[len(sizes) // 2]
+    max_cells = 2 * math.ceil(count ** (1 / 3))
+    return origin, max(median, span / max_cells, TOLERANCE)
+
+
+def _cell_range(axis: Tuple[float, float], start: float, end: float) -> range:
+    # Faces within TOLERANCE of a cell boundary stay out of the next cell
+    origin, cell = axis
+    first = math.floor((start - origin + TOLERANCE) / cell)
+    last = math.floor((end - origin - TOLERANCE) / cell)
+    return range(first, max(first, last) + 1)
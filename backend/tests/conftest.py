@@ -0,0 +1,69 @@
+import os
+
+# Before any app import: no packing processes, and never the developer's database
+os.environ.setdefault("PACKING_WORKERS", "0")
+os.environ["DATABASE_URL"] = "sqlite://"
+
+from app.database import Base, get_db
+from app.models import sql_models  # noqa: F401 (registers the tables)
+from app.models.schemas import Bin, Item
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import itertools
+import pytest
+
+_ids = itertools.count(1)
+
+
+@pytest.fixture
+def make_item():
+    def make(width, height, depth, quantity=1, rotation="none", **fields):
+        return Item(
+            id=fields.pop("id", f"item-{next(_ids)}"), name="box", color="#888888",
+            width=width, height=height, depth=depth,
+            quantity=quantity, rotation=rotation, **fields,
+        )
+    return make
+
+
+@pytest.fixture
+def make_bin():
+    def make(width, height, depth):
+        return Bin(width=width, height=height, depth=depth)
+    return make
+
+
+@pytest.fixture
+def db_engine():
+    # One in-memory database shared by every session of the test
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(db_engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db_engine):
+    from app.main import app
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+    def override_get_db():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
@@ -0,0 +1,161 @@
+from app.api import endpoints
+from app.services.admission import AdmissionController, AdmissionRejected
+import asyncio
+import pytest
+
+
+def controller(**overrides):
+    options = dict(
+        max_concurrent=1, max_inflight_cost=10**9, max_queue=10, queue_timeout=15,
+        max_items=5000, max_bins=50, batch_queue_timeout=60,
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+def test_oversized_manifests_are_rejected():
+    ctrl = controller(max_items=10, max_bins=2)
+    ctrl.check_size(10, 2)
+    with pytest.raises(AdmissionRejected) as e:
+        ctrl.check_size(11, 1)
+    assert e.value.status_code == 413
+    assert ctrl.counters["rejected_too_large"] == 1
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    ctrl = controller(max_queue=1)
+
+    async def scenario():
+        async with ctrl.admit(100):
+            waiting = asyncio.ensure_future(ctrl.admit(100).__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected) as e:
+                async with ctrl.admit(100):
+                    pass
+            waiting.cancel()
+            return e.value
+
+    rejected = asyncio.run(scenario())
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+
+
+def test_queue_timeout_is_rejected():
+    ctrl = controller(queue_timeout=0.05)
+
+    async def scenario():
+        async with ctrl.admit(100):
+            with pytest.raises(AdmissionRejected) as e:
+                async with ctrl.admit(100):
+                    pass
+            return e.value
+
+    assert asyncio.run(scenario()).status_code == 503
+    assert ctrl.counters["rejected_timeout"] == 1
+    assert ctrl.inflight == 0 and not ctrl._waiters
+
+
+def test_inflight_cost_budget():
+    ctrl = controller(max_concurrent=4, max_inflight_cost=1000)
+    assert ctrl._has_room(5000)  # An oversized job may run alone
+    ctrl._grant(600, "interactive", 0.0)
+    assert ctrl._has_room(400)
+    assert not ctrl._has_room(401)
+    ctrl._release(600)
+    assert ctrl.inflight == 0 and ctrl.inflight_cost == 0
+
+
+def admission_order(ctrl, jobs, waited=None):
+    """
+    Queues `jobs` [(name, cost, priority)] behind a running job and returns
+    the order they are admitted in. `waited` backdates queue entries by name.
+    """
+    async def scenario():
+        order = []
+        release = asyncio.Event()
+
+        async def job(name, cost, priority=None):
+            async with ctrl.admit(cost, priority):
+                order.append(name)
+                if name == "running":
+                    await release.wait()
+
+        tasks = [asyncio.ensure_future(job("running", 1))]
+        await asyncio.sleep(0)
+        for name, cost, priority in jobs:
+            tasks.append(asyncio.ensure_future(job(name, cost, priority)))
+            await asyncio.sleep(0)
+        for entry, (name, _, _) in zip(ctrl._waiters, jobs):
+            entry.enqueued -= (waited or {}).get(name, 0)
+        release.set()
+        await asyncio.gather(*tasks)
+        return order[1:]
+
+    return asyncio.run(scenario())
+
+
+def test_shortest_job_first():
+    order = admission_order(controller(), [("large", 4000, None), ("small", 10, None), ("medium", 500, None)])
+    assert order == ["small", "medium", "large"]
+
+
+def test_batch_class_is_weighted():
+    order = admission_order(controller(), [("batch", 1000, "batch"), ("interactive", 3000, "interactive")])
+    assert order == ["interactive", "batch"]
+
+
+def test_waiting_jobs_age():
+    ctrl = controller()
+    ctrl.seconds_per_cost = 1e-3
+    # 1000 x 1e-3 x 4 = 4 s of weighted estimate, made up by 5 s of waiting
+    order = admission_order(ctrl, [("batch", 1000, "batch"), ("interactive", 10, None)], waited={"batch": 5})
+    assert order == ["batch", "interactive"]
+
+
+def test_large_batch_jobs_overtake_new_arrivals_within_their_queue_timeout():
+    ctrl = controller()
+    ctrl.seconds_per_cost = 1e-3
+    # 800 s of weighted estimate: a fixed aging rate of 1 would take minutes
+    jobs = [("batch", 200_000, "batch"), ("interactive", 10, None)]
+    assert admission_order(ctrl, jobs, waited={"batch": 20}) == ["interactive", "batch"]
+    assert admission_order(ctrl, jobs, waited={"batch": 31}) == ["batch", "interactive"]
+
+
+def test_average_wait_is_the_mean_per_class():
+    ctrl = controller()
+    ctrl._grant(1, "batch", 2.0)
+    ctrl._grant(1, "batch", 4.0)
+    ctrl._grant(1, "batch", 6.0)
+    stats = ctrl.snapshot()["classes"]
+    assert stats["batch"]["admitted"] == 3
+    assert stats["batch"]["average_wait_seconds"] == 4.0
+    assert stats["interactive"]["average_wait_seconds"] == 0.0
+
+
+def test_optimize_rejects_oversized_manifests_and_reports_it(client, monkeypatch):
+    monkeypatch.setattr(endpoints.admission, "max_items", 5)
+    before = client.get("/metrics").json()["admission"]["rejected_too_large"]
+
+    item = {"id": "a", "name": "a", "color": "#fff", "width": 1, "height": 1, "depth": 1, "quantity": 6}
+    response = client.post("/optimize", json={"bins": [{"width": 10, "height": 10, "depth": 10}], "items": [item]})
+    assert response.status_code == 413
+
+    metrics = client.get("/metrics").json()
+    assert metrics["admission"]["rejected_too_large"] == before + 1
+    assert metrics["admission"]["inflight"] == 0
+    assert set(metrics["admission"]["classes"]) == {"interactive", "batch"}
+    assert {"workers", "cancelled", "timed_out"} <= set(metrics["executor"])
+
+
+def test_requests_are_admitted_in_their_priority_class(client):
+    def admitted():
+        classes = client.get("/metrics").json()["admission"]["classes"]
+        return classes["interactive"]["admitted"], classes["batch"]["admitted"]
+
+    item = {"id": "a", "name": "a", "color": "#fff", "width": 1, "height": 1, "depth": 1}
+    request = {"bins": [{"width": 10, "height": 10, "depth": 10}], "items": [item]}
+    interactive, batch = admitted()
+    assert client.post("/optimize", json=request).status_code == 200
+    assert client.post("/optimize", json=dict(request, priority="batch")).status_code == 200
+    assert admitted() == (interactive + 1, batch + 1)
+    assert client.post("/optimize", json=dict(request, priority="urgent")).status_code == 422
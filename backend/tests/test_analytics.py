@@ -0,0 +1,117 @@
+from app.models.sql_models import OptimizationRecord, OptimizationRollup
+from app.services.analytics import rebuild_rollups, record_run, summarize, week_start
+from datetime import date, datetime, timezone
+import json
+import pytest
+
+
+def legacy_record(packed_count=3, efficiency=30.0):
+    # Format stored before SKU quantities: a flat list of placed Item dicts
+    items = [
+        {"id": f"box-{i}", "name": "box", "width": 10, "height": 10, "depth": 10, "color": "#888",
+         "x": 10 * i, "y": 0, "z": 0}
+        for i in range(packed_count)
+    ]
+    return OptimizationRecord(
+        bin_width=100, bin_height=10, bin_depth=10, item_count=packed_count + 1,
+        items_json=json.dumps(items), efficiency=efficiency,
+        packed_items_json=json.dumps(items), unpacked_items_json="[]",
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def grouped_record(bins=2, per_bin=4, efficiency=50.0):
+    packed = [
+        {"bin_id": f"Bin {b + 1}", "efficiency": efficiency,
+         "placements": [{"item_id": "sku", "positions": [[0, 0, i] for i in range(per_bin)]}]}
+        for b in range(bins)
+    ]
+    return OptimizationRecord(
+        bin_width=10, bin_height=10, bin_depth=10, item_count=bins * per_bin,
+        items_json="[]", efficiency=efficiency,
+        packed_items_json=json.dumps(packed), unpacked_items_json="[]",
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def rollups(db):
+    return {(r.bin_width, r.bin_height, r.bin_depth): r for r in db.query(OptimizationRollup)}
+
+
+def test_week_start_is_monday_utc():
+    assert week_start(datetime(2024, 5, 15, 12, tzinfo=timezone.utc)) == date(2024, 5, 13)
+    assert week_start(datetime(2024, 5, 13, 0, 30)) == date(2024, 5, 13)
+
+
+def test_record_run_accumulates_per_week_and_size(db):
+    period = date(2024, 5, 13)
+    for efficiency in (40.0, 60.0):
+        record_run(db, period, (10, 10, 10), item_count=5, packed_count=4, bins_opened=1,
+                   bin_volume=1000.0, used_volume=efficiency * 10, efficiency_sum=efficiency)
+    db.commit()
+    row = rollups(db)[(10, 10, 10)]
+    assert (row.runs, row.item_count, row.packed_count, row.efficiency_sum) == (2, 10, 8, 100.0)
+
+
+def test_backfill_counts_grouped_records(db):
+    db.add(grouped_record(bins=2, per_bin=4))
+    db.commit()
+    assert rebuild_rollups(db) == 1
+    row = rollups(db)[(10, 10, 10)]
+    assert (row.runs, row.bins_opened, row.packed_count, row.bin_volume) == (1, 2, 8, 2000.0)
+
+
+def test_backfill_reads_legacy_flat_records_as_one_bin(db):
+    db.add(legacy_record(packed_count=3, efficiency=30.0))
+    db.commit()
+    assert rebuild_rollups(db) == 1
+    row = rollups(db)[(100, 10, 10)]
+    assert (row.runs, row.bins_opened, row.packed_count, row.item_count) == (1, 1, 3, 4)
+    assert row.bin_volume == 10000.0
+    assert row.used_volume == pytest.approx(3000.0)
+
+
+def test_backfill_runs_once(db):
+    db.add(legacy_record())
+    db.commit()
+    assert rebuild_rollups(db) == 1
+    assert rebuild_rollups(db) is None
+    assert rollups(db)[(100, 10, 10)].runs == 1
+
+
+def test_backfill_refuses_when_rollups_were_filled_without_it(db):
+    record_run(db, week_start(), (10, 10, 10), item_count=1, packed_count=1, bins_opened=1,
+               bin_volume=1000.0, used_volume=100.0, efficiency_sum=10.0)
+    db.commit()
+    with pytest.raises(RuntimeError):
+        rebuild_rollups(db)
+
+
+def test_summary(db):
+    db.add(legacy_record(packed_count=3, efficiency=30.0))
+    db.add(grouped_record(bins=2, per_bin=4, efficiency=50.0))
+    db.commit()
+    rebuild_rollups(db)
+    report = summarize(db, weeks=4)
+    totals = report["totals"]
+    assert (totals["runs"], totals["packed_count"], totals["bins_opened"]) == (2, 11, 3)
+    assert totals["average_efficiency"] == 40.0
+    assert [row["runs"] for row in report["bin_sizes"]] == [1, 1]
+    assert len(report["weeks"]) == 1
+
+
+def test_analytics_endpoint_follows_optimize_runs(client):
+    items = [{"id": "sku", "name": "box", "color": "#888", "width": 5, "height": 5, "depth": 5, "quantity": 10}]
+    bins = [{"width": 10, "height": 10, "depth": 10}] * 2
+    for _ in range(2):
+        response = client.post("/optimize", json={"bins": bins, "items": items})
+        assert response.status_code == 200
+
+    report = client.get("/analytics", params={"weeks": 1}).json()
+    totals = report["totals"]
+    assert (totals["runs"], totals["item_count"], totals["packed_count"], totals["bins_opened"]) == (2, 20, 20, 4)
+    assert totals["utilization"] == pytest.approx(62.5)
+    assert report["bin_sizes"][0]["bin_width"] == 10
+    assert report["weeks"][0]["period_start"] == week_start().isoformat()
+
+    assert client.get("/analytics", params={"weeks": 0}).status_code == 422
@@ -0,0 +1,66 @@
+from app.models.schemas import Bin
+from app.services.ems_packer import EMSPackingEngine
+import random
+
+
+def bound_engine(width=10, height=10, depth=10, min_dimension=0):
+    engine = EMSPackingEngine()
+    engine.bind_state(engine.new_state(Bin(width=width, height=height, depth=depth)))
+    engine.min_dimension = min_dimension
+    return engine
+
+
+def test_corner_box_leaves_three_maximal_spaces():
+    engine = bound_engine()
+    engine._split_spaces((0, 0, 0, 4, 4, 4))
+    assert sorted(engine.spaces) == [
+        (0, 0, 4, 10, 10, 10),
+        (0, 4, 0, 10, 10, 10),
+        (4, 0, 0, 10, 10, 10),
+    ]
+
+
+def test_full_width_slab_leaves_one_space():
+    engine = bound_engine()
+    engine._split_spaces((0, 0, 0, 10, 10, 4))
+    assert engine.spaces == [(0, 0, 4, 10, 10, 10)]
+
+
+def test_residuals_inside_other_spaces_are_pruned():
+    engine = bound_engine()
+    engine._split_spaces((0, 0, 0, 4, 4, 4))
+    engine._split_spaces((4, 0, 0, 8, 4, 4))
+    # The y and z residuals of the split space lie inside the untouched spaces
+    assert sorted(engine.spaces) == [
+        (0, 0, 4, 10, 10, 10),
+        (0, 4, 0, 10, 10, 10),
+        (8, 0, 0, 10, 10, 10),
+    ]
+
+
+def test_spaces_thinner_than_every_item_are_dropped():
+    engine = bound_engine(min_dimension=3)
+    engine._split_spaces((0, 0, 0, 8, 10, 10))
+    assert engine.spaces == []
+
+
+def test_spaces_stay_free_and_maximal(make_item, make_bin):
+    rng = random.Random(7)
+    items = [
+        make_item(rng.randint(1, 6), rng.randint(1, 6), rng.randint(1, 6), quantity=rng.randint(1, 4), rotation="any")
+        for _ in range(15)
+    ]
+    engine = EMSPackingEngine()
+    engine.pack([make_bin(12, 12, 12)], items)
+
+    spaces = engine.spaces
+    for x1, y1, z1, x2, y2, z2 in spaces:
+        for p in engine.packed_items:
+            assert not (x1 < p.x + p.width and x2 > p.x and
+                        y1 < p.y + p.height and y2 > p.y and
+                        z1 < p.z + p.depth and z2 > p.z)
+    for i, a in enumerate(spaces):
+        for j, b in enumerate(spaces):
+            if i != j:
+                assert not (b[0] <= a[0] and b[1] <= a[1] and b[2] <= a[2] and
+                            b[3] >= a[3] and b[4] >= a[4] and b[5] >= a[5])
@@ -0,0 +1,54 @@
+from app.services.ems_packer import EMSPackingEngine
+from app.services.orientation import ALLOWED_ROTATIONS, rotate
+from app.services.packer import PackingEngine
+from app.services.stats import PackingCounters
+from app.services.validator import find_out_of_bounds, find_overlaps
+import pytest
+import random
+
+ENGINES = [PackingEngine, EMSPackingEngine]
+
+
+def manifest(make_item, rotation, seed=3, skus=20):
+    rng = random.Random(seed)
+    return [
+        make_item(rng.randint(2, 9), rng.randint(2, 9), rng.randint(2, 9), quantity=rng.randint(1, 5), rotation=rotation)
+        for _ in range(skus)
+    ]
+
+
+@pytest.mark.parametrize("engine_class", ENGINES)
+@pytest.mark.parametrize("rotation", ["none", "upright", "any"])
+@pytest.mark.parametrize("min_support", [0.0, 0.75])
+def test_plans_have_no_overlaps_and_stay_in_bounds(make_item, make_bin, engine_class, rotation, min_support):
+    items = manifest(make_item, rotation)
+    bins = [make_bin(20, 15, 20), make_bin(12, 12, 12)]
+    packed_bins, unpacked = engine_class(min_support=min_support).pack(bins, items)
+
+    assert packed_bins
+    placed = sum(len(b["placements"]) for b in packed_bins)
+    assert placed + sum(count for _, count in unpacked) == sum(i.quantity for i in items)
+    for bin_dims, packed in zip(bins, packed_bins):
+        boxes = []
+        for p in packed["placements"]:
+            assert p.rotation in ALLOWED_ROTATIONS[rotation]
+            assert (p.width, p.height, p.depth) == rotate((p.item.width, p.item.height, p.item.depth), p.rotation)
+            boxes.append(make_item(p.width, p.height, p.depth, x=p.x, y=p.y, z=p.z))
+        assert find_overlaps(boxes) == ([], False)
+        assert find_out_of_bounds(bin_dims, boxes) == []
+
+
+
+@pytest.mark.parametrize("engine_class", ENGINES)
+def test_counters_do_not_change_the_plan(make_item, make_bin, engine_class):
+    items = manifest(make_item, "any", seed=8)
+    bins = [make_bin(20, 15, 20)]
+    plain, _ = engine_class(min_support=0.75).pack(bins, items)
+    engine = engine_class(min_support=0.75)
+    engine.stats = PackingCounters()
+    counted, _ = engine.pack(bins, items)
+
+    def layout(packed_bins):
+        return [(p.x, p.y, p.z, p.rotation) for b in packed_bins for p in b["placements"]]
+    assert layout(counted) == layout(plain)
+    assert engine.stats.placements == len(layout(plain))
@@ -0,0 +1,124 @@
+from app import config
+from app.services.admission import AdmissionController
+from app.services.cancellation import JobCancelled
+from app.services.executor import PackingExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import pytest
+import time
+
+
+def search_job(slot, iterations=2000, deadline=None):
+    # About 150 units: thousands of search iterations take far longer than any test
+    items = [(10 + i % 7, 5 + i % 5, 8 + i % 3, None, None, 3, "any") for i in range(50)]
+    return [(100, 100, 100)], items, ("greedy", 0.75, iterations, False, 0, slot, deadline)
+
+
+@pytest.fixture(params=[0, 1], ids=["threads", "processes"])
+def executor(request):
+    executor = PackingExecutor(request.param)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def test_jobs_run(executor):
+    packed_bins, unpacked, stats = asyncio.run(executor.run(search_job(-1, iterations=0)))
+    assert packed_bins and stats is None
+
+
+def test_cancelled_caller_stops_the_job_before_releasing_it(executor):
+    admission = AdmissionController(
+        max_concurrent=1, max_inflight_cost=10**9, max_queue=4, queue_timeout=5, max_items=5000, max_bins=50,
+    )
+
+    async def scenario():
+        with executor.cancellation() as token:
+            async def work():
+                async with admission.admit(1):
+                    return await executor.run(search_job(token.slot), token)
+
+            task = asyncio.ensure_future(work())
+            await asyncio.sleep(0.5)
+            assert admission.inflight == 1
+            started = time.perf_counter()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            # The job saw its flag and stopped before admission was released
+            assert executor._jobs[token.slot].done()
+            assert admission.inflight == 0
+            return time.perf_counter() - started, token.slot
+
+    stopped_after, slot = asyncio.run(scenario())
+    assert stopped_after < 5
+    assert executor.counters["cancelled"] == 1
+    assert executor.flags[slot] == 0 and slot in executor._free_slots
+
+
+def test_deadline_times_the_job_out(executor):
+    with pytest.raises(JobCancelled) as e:
+        asyncio.run(executor.run(search_job(-1, deadline=time.time() - 1)))
+    assert e.value.reason == "timeout"
+    assert executor.counters["timed_out"] == 1
+
+
+def kill_workers(pool):
+    for process in list(pool._processes.values()):
+        process.kill()
+
+
+@pytest.fixture
+def process_executor():
+    executor = PackingExecutor(1)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+def test_a_dead_worker_is_replaced_and_its_job_retried(process_executor):
+    executor = process_executor
+
+    async def scenario():
+        # A couple of seconds of search
+        task = asyncio.ensure_future(executor.run(search_job(-1, iterations=5)))
+        await asyncio.sleep(0.5)
+        broken = executor.pool
+        kill_workers(broken)
+        return await task, broken
+
+    (packed_bins, unpacked, stats), broken = asyncio.run(scenario())
+    assert packed_bins
+    assert executor.pool is not broken
+    assert executor.counters["pool_restarts"] == 1
+    assert asyncio.run(executor.run(search_job(-1, iterations=0)))[0]
+
+
+def test_a_job_that_breaks_the_pool_twice_fails(process_executor):
+    executor = process_executor
+
+    async def scenario():
+        task = asyncio.ensure_future(executor.run(search_job(-1)))
+        for _ in range(2):
+            await asyncio.sleep(0.5)
+            kill_workers(executor.pool)
+        await task
+
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(scenario())
+    assert executor.counters["pool_restarts"] == 2
+    # Later jobs get a working pool
+    assert asyncio.run(executor.run(search_job(-1, iterations=0)))[0]
+
+
+def test_optimize_past_the_deadline_is_a_504(client, monkeypatch):
+    monkeypatch.setattr(config, "JOB_TIMEOUT_SECONDS", 0.001)
+    before = client.get("/metrics").json()["executor"]["timed_out"]
+    item = {"id": "a", "name": "a", "color": "#fff", "width": 1, "height": 1, "depth": 1, "quantity": 50}
+    request = {"bins": [{"width": 10, "height": 10, "depth": 10}], "items": [item], "search_iterations": 2000}
+
+    response = client.post("/optimize", json=request)
+    assert response.status_code == 504
+    assert client.get("/metrics").json()["executor"]["timed_out"] == before + 1
+    # Nothing was stored for the run
+    assert client.get("/analytics").json()["totals"]["runs"] == 0
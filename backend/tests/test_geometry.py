@@ -0,0 +1,34 @@
+from app.services.geometry import Quantizer
+
+
+def test_item_sizes_round_up_and_bins_round_down():
+    q = Quantizer(0.1)
+    assert q.size(1.01) == 11
+    assert q.capacity(1.09) == 10
+
+
+def test_exact_grid_values_ignore_float_noise():
+    q = Quantizer(0.1)
+    # 0.3 / 0.1 == 2.9999999999999996
+    assert q.size(0.3) == 3
+    assert q.capacity(0.3) == 3
+    assert q.size(0.7) == 7
+
+
+def test_to_units_strips_binary_noise():
+    assert Quantizer(0.1).to_units(3) == 0.3
+    assert Quantizer(0.25).to_units(6) == 1.5
+
+
+def test_resolution_packs_a_full_grid_through_the_api(client):
+    item = {"id": "cube", "name": "cube", "color": "#888", "width": 0.1, "height": 0.1, "depth": 0.1, "quantity": 27}
+    request = {"bins": [{"width": 0.3, "height": 0.3, "depth": 0.3}], "items": [item], "min_support": 0}
+
+    # In floats 0.1 + 0.1 + 0.1 > 0.3, so only two cubes fit per axis
+    assert client.post("/optimize", json=request).json()["packed_count"] == 8
+
+    body = client.post("/optimize", json=dict(request, resolution=0.1)).json()
+    assert body["packed_count"] == 27
+    assert body["packed_bins"][0]["efficiency"] == 100.0
+    coordinates = {item[axis] for item in body["packed_bins"][0]["packed_items"] for axis in "xyz"}
+    assert coordinates == {0.0, 0.1, 0.2}
@@ -0,0 +1,57 @@
+from app.services.height_map import HeightMap
+
+
+def test_grid_is_capped_by_max_cells():
+    hm = HeightMap(1000, 10, cell_size=1, max_cells=128)
+    assert (hm.nx, hm.nz) == (128, 10)
+    assert hm.cell_x == 1000 / 128
+
+
+def test_span_uses_cell_centers():
+    hm = HeightMap(10, 10, cell_size=1)
+    # Centers 0.5 .. 9.5: [0.4, 2.6) covers the cells centered at 0.5, 1.5 and 2.5
+    assert hm._span(0.4, 2.2, 1, 10) == (0, 3)
+    # [0.6, 2.4) only covers 1.5
+    assert hm._span(0.6, 1.8, 1, 10) == (1, 2)
+    # Clamped to the grid
+    assert hm._span(8, 5, 1, 10) == (8, 10)
+
+
+def test_narrow_footprint_uses_the_cell_under_its_center():
+    hm = HeightMap(10, 10, cell_size=1)
+    assert hm._span(3.1, 0.2, 1, 10) == (3, 4)
+
+
+def test_resting_height_is_the_highest_cell_below():
+    hm = HeightMap(10, 10, cell_size=1)
+    hm.place(0, 0, 0, 4, 3, 4, owner=0)
+    assert hm.resting_height(0, 0, 4, 4) == 3
+    assert hm.resting_height(2, 2, 4, 4) == 3
+    assert hm.resting_height(4, 4, 4, 4) == 0
+
+
+def test_support_fraction_and_supporters():
+    hm = HeightMap(10, 10, cell_size=1)
+    hm.place(0, 0, 0, 4, 3, 4, owner=0)
+    hm.place(4, 0, 0, 4, 3, 4, owner=1)
+    # A 4x4 base at height 3 straddling both boxes and the floor
+    assert hm.support_fraction(2, 3, 2, 4, 4) == 0.5
+    assert hm.supporters(2, 3, 2, 4, 4) == {0: 4, 1: 4}
+    # Floor cells never count as supporters
+    assert hm.supporters(0, 0, 5, 4, 4) == {}
+
+
+def test_place_keeps_the_higher_surface():
+    hm = HeightMap(10, 10, cell_size=1)
+    hm.place(0, 0, 0, 4, 5, 4, owner=0)
+    hm.place(0, 0, 0, 4, 2, 4, owner=1)
+    assert hm.resting_height(0, 0, 4, 4) == 5
+    assert hm.supporters(0, 5, 0, 4, 4) == {0: 16}
+
+
+def test_copy_is_independent():
+    hm = HeightMap(10, 10, cell_size=1)
+    clone = hm.copy()
+    clone.place(0, 0, 0, 10, 1, 10, owner=0)
+    assert hm.resting_height(0, 0, 10, 10) == 0
+    assert clone.resting_height(0, 0, 10, 10) == 1
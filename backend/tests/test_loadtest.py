@@ -0,0 +1,35 @@
+from tools.loadtest import PROFILES, build_payload, parse_mix, percentile, summarize
+import argparse
+import pytest
+import random
+
+
+def test_nearest_rank_percentiles():
+    values = list(range(1, 101))
+    assert [percentile(values, p) for p in (1, 50, 95, 99, 100)] == [1, 50, 95, 99, 100]
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_mix_parsing():
+    assert parse_mix("small=0.9, large=0.1") == {"small": 0.9, "large": 0.1}
+    assert parse_mix("search") == {"search": 1.0}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_mix("huge=1")
+
+
+def test_payloads_follow_their_profile():
+    rows, quantity, bins, iterations = PROFILES["large"]
+    payload = build_payload("large", random.Random(1))
+    assert (len(payload["items"]), len(payload["bins"]), payload["search_iterations"]) == (rows, bins, iterations)
+    assert all(item["quantity"] == quantity for item in payload["items"])
+    assert payload["compact"]
+
+
+def test_summary_per_profile():
+    samples = [("small", 200, 0.01), ("small", 429, 0.002), ("large", 200, 0.5)]
+    report = summarize(samples, elapsed=2.0)
+    assert report["overall"]["requests"] == 3 and report["overall"]["errors"] == 1
+    assert report["overall"]["throughput_rps"] == 1.5
+    assert report["profiles"]["small"]["statuses"] == {"200": 1, "429": 1}
+    assert report["profiles"]["large"]["p99_ms"] == 500.0
@@ -0,0 +1,122 @@
+from app.services.manifest import ManifestError, read_manifest
+import io
+import json
+import pytest
+
+
+def csv_file(text):
+    return io.BytesIO(text.encode("utf-8"))
+
+
+def xlsx_file(rows):
+    from openpyxl import Workbook
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def read_csv(text, max_groups=100):
+    return read_manifest(csv_file(text), "manifest.csv", max_groups).items
+
+
+def test_identical_rows_are_merged():
+    items = read_csv("sku,w,h,l,qty\nA,1,2,3,2\nA,1,2,3,3\nB,1,2,3,\n")
+    assert [(i.id, i.quantity) for i in items] == [("A", 5), ("B", 1)]
+    assert (items[0].width, items[0].height, items[0].depth) == (1, 2, 3)
+
+
+def test_skus_with_equal_dimensions_stay_apart():
+    items = read_csv("sku,name,width,height,depth\nA,box,1,1,1\nB,box,1,1,1\n")
+    assert [i.id for i in items] == ["A", "B"]
+
+
+def test_rows_without_ids_get_line_ids():
+    items = read_csv("name,width,height,depth\nbox,1,1,1\ncrate,2,2,2\nbox,1,1,1\n")
+    assert [(i.id, i.name, i.quantity) for i in items] == [("L2", "box", 2), ("L3", "crate", 1)]
+
+
+def test_reused_id_for_a_different_item_is_rejected():
+    with pytest.raises(ManifestError, match="Line 3"):
+        read_csv("sku,width,height,depth\nA,1,1,1\nA,2,1,1\n")
+
+
+@pytest.mark.parametrize("quantity", ["2.9", "-1", "many"])
+def test_bad_quantities_are_rejected(quantity):
+    with pytest.raises(ManifestError, match="Line 2"):
+        read_csv(f"width,height,depth,quantity\n1,1,1,{quantity}\n")
+
+
+def test_whole_float_quantity_and_zero_quantity():
+    items = read_csv("sku,width,height,depth,quantity\nA,1,1,1,2.0\nB,1,1,1,0\n")
+    assert [(i.id, i.quantity) for i in items] == [("A", 2)]
+
+
+def test_rotation_column():
+    items = read_csv("sku,width,height,depth,orientation\nA,1,1,1,Upright\nB,1,1,1,\n")
+    assert [i.rotation for i in items] == ["upright", "none"]
+    with pytest.raises(ManifestError):
+        read_csv("width,height,depth,rotation\n1,1,1,sideways\n")
+
+
+def test_header_and_format_errors():
+    with pytest.raises(ManifestError, match="missing column"):
+        read_csv("sku,width,height\nA,1,1\n")
+    with pytest.raises(ManifestError, match="empty"):
+        read_csv("\n\n")
+    with pytest.raises(ManifestError, match="distinct items"):
+        read_csv("width,height,depth\n1,1,1\n2,2,2\n", max_groups=1)
+    with pytest.raises(ManifestError, match="Unsupported"):
+        read_manifest(csv_file("width,height,depth\n"), "manifest.pdf", 10)
+
+
+def test_csv_with_byte_order_mark():
+    items = read_manifest(io.BytesIO("﻿width,height,depth\n1,1,1\n".encode("utf-8")), "m.csv", 10).items
+    assert len(items) == 1
+
+
+def test_xlsx_rows_are_grouped_like_csv():
+    rows = [
+        ["SKU", "Width", "Height", "Depth", "Qty", "Weight"],
+        [100, 1, 2, 3, 2, None],
+        [100, 1, 2, 3, None, None],
+        ["B", 1.5, 2, 3, 4, 2.5],
+        ["C", 1, 1, 1, 0, None],
+        [None, None, None, None, None, None],
+    ]
+    items = read_manifest(xlsx_file(rows), "manifest.xlsx", 100).items
+    # Numeric SKUs keep their integer form; an empty quantity cell means 1 and 0 means none
+    assert [(i.id, i.quantity, i.weight) for i in items] == [("100", 3, None), ("B", 4, 2.5)]
+
+
+def test_xlsx_fractional_quantity_is_rejected():
+    rows = [["width", "height", "depth", "quantity"], [1, 1, 1, 2.9]]
+    with pytest.raises(ManifestError, match="whole number"):
+        read_manifest(xlsx_file(rows), "manifest.xlsx", 100)
+
+
+def test_upload_route(client):
+    manifest = "sku,width,height,depth,qty\nA,10,10,10,3\nB,20,20,20,1\n"
+    response = client.post(
+        "/optimize/upload",
+        files={"file": ("manifest.csv", manifest, "text/csv")},
+        data={"bins": json.dumps([{"width": 100, "height": 100, "depth": 100}]), "compact": "true"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total_items"], body["packed_count"]) == (4, 4)
+    placements = {p["item_id"]: p for p in body["packed_bins"][0]["placements"]}
+    assert len(placements["A"]["positions"]) == 3
+
+
+def test_upload_route_rejects_bad_manifests(client):
+    response = client.post(
+        "/optimize/upload",
+        files={"file": ("manifest.csv", "sku,width,height,depth,qty\nA,10,10,10,2.5\n", "text/csv")},
+        data={"bins": json.dumps([{"width": 100, "height": 100, "depth": 100}])},
+    )
+    assert response.status_code == 400
+    assert "Line 2" in response.json()["detail"]
@@ -0,0 +1,51 @@
+from app.services.orientation import ALLOWED_ROTATIONS, ROTATIONS, orientation_table, rotate
+
+
+def test_rotations_are_distinct_permutations():
+    assert len(set(ROTATIONS)) == 6
+    assert all(sorted(p) == [0, 1, 2] for p in ROTATIONS)
+
+
+def test_upright_rotations_keep_the_height():
+    for rotation in ALLOWED_ROTATIONS["upright"]:
+        assert rotate((1, 2, 3), rotation)[1] == 2
+
+
+def test_fixed_item_has_one_orientation(make_item):
+    assert orientation_table(make_item(1, 2, 3)) == [(1, 2, 3, 0)]
+
+
+def test_free_item_has_all_six(make_item):
+    table = orientation_table(make_item(1, 2, 3, rotation="any"))
+    assert len(table) == 6
+    assert table[0] == (1, 2, 3, 0)
+    assert {tuple(sorted(o[:3])) for o in table} == {(1, 2, 3)}
+
+
+def test_duplicate_orientations_are_dropped(make_item):
+    assert len(orientation_table(make_item(2, 2, 2, rotation="any"))) == 1
+    assert len(orientation_table(make_item(2, 5, 2, rotation="any"))) == 3
+    assert len(orientation_table(make_item(2, 5, 2, rotation="upright"))) == 1
+
+
+def test_orientations_fitting_no_bin_are_dropped(make_item, make_bin):
+    table = orientation_table(make_item(1, 2, 10, rotation="upright"), [make_bin(10, 5, 5)])
+    assert table == [(10, 2, 1, 1)]
+    assert orientation_table(make_item(1, 2, 10), [make_bin(5, 5, 5)]) == []
+
+
+def test_rotated_units_report_their_placed_dimensions(client):
+    # Standing on end is the only way into the bin
+    item = {"id": "rod", "name": "rod", "color": "#888", "width": 2, "height": 10, "depth": 3, "quantity": 2}
+    request = {"bins": [{"width": 10, "height": 2, "depth": 6}], "items": [item], "min_support": 0}
+
+    assert client.post("/optimize", json=request).json()["packed_count"] == 0
+    expanded = client.post("/optimize", json=dict(request, items=[dict(item, rotation="any")])).json()
+    assert expanded["packed_count"] == 2
+    for unit in expanded["packed_bins"][0]["packed_items"]:
+        assert (unit["width"], unit["height"]) == (10, 2)
+        assert unit["rotation"] == "any"
+
+    compact = client.post("/optimize", json=dict(request, items=[dict(item, rotation="any")], compact=True)).json()
+    rotations = compact["packed_bins"][0]["placements"][0]["rotations"]
+    assert len(rotations) == 2 and all(rotations)
@@ -0,0 +1,56 @@
+from app.services.packer import PackingEngine
+
+
+def test_boxes_need_enough_support(make_item, make_bin):
+    # The plank only fits on top of the column, where half its base overhangs
+    column = make_item(4, 4, 4)
+    plank = make_item(4, 1, 8)
+    bins = [make_bin(4, 10, 8)]
+
+    packed_bins, unpacked = PackingEngine(min_support=0.75).pack_sequence(bins, [column, plank])
+    assert unpacked == [(plank, 1)]
+
+    packed_bins, unpacked = PackingEngine(min_support=0.5).pack_sequence(bins, [column, plank])
+    assert unpacked == []
+    assert packed_bins[0]["placements"][1].y == 4
+
+
+def test_stacking_limit_is_respected(make_item, make_bin):
+    fragile = make_item(4, 2, 4, weight=1, max_stack_weight=5)
+    heavy = make_item(4, 2, 4, weight=10)
+    packed_bins, unpacked = PackingEngine(min_support=0.75).pack_sequence([make_bin(4, 10, 4)], [fragile, heavy])
+    assert [p.item for p in packed_bins[0]["placements"]] == [fragile]
+    assert unpacked == [(heavy, 1)]
+
+
+def test_light_boxes_may_stack_on_fragile_ones(make_item, make_bin):
+    fragile = make_item(4, 2, 4, weight=1, max_stack_weight=5)
+    light = make_item(4, 2, 4, weight=2, quantity=2)
+    packed_bins, unpacked = PackingEngine(min_support=0.75).pack_sequence([make_bin(4, 10, 4)], [fragile, light])
+    # Both light boxes load the fragile one: 2 + 2 <= 5
+    assert len(packed_bins[0]["placements"]) == 3 and unpacked == []
+
+
+def test_copies_share_a_height_map_until_one_is_written(make_item, make_bin):
+    box = make_item(4, 4, 4, quantity=3)
+    bin_dims = make_bin(8, 8, 8)
+    engine = PackingEngine(min_support=0.75)
+    engine.prepare([box], [bin_dims])
+    state = engine.new_state(bin_dims)
+    engine.bind_state(state)
+    engine.place_units(box, 1)
+
+    saved = state.copy(share_height_map=True)
+    resumed = engine.resume_state(saved)
+    assert resumed.height_map is saved.height_map is state.height_map
+
+    for working in (state, resumed):
+        engine.bind_state(working)
+        engine.place_units(box, 1)
+        assert working.height_map is not saved.height_map
+        assert len(working.packed_items) == 2
+    # The saved state still sees a single box
+    assert len(saved.packed_items) == 1
+    assert saved.height_map.resting_height(0, 0, 8, 8) == 4
+    assert saved.height_map.owners.count(0) == sum(1 for h in saved.height_map.heights if h == 4)
+    assert saved.height_map.owners.count(1) == 0
@@ -0,0 +1,64 @@
+from app.controllers.packing_controller import PackingController
+from app.models.schemas import PackingRequest
+
+BIN = {"width": 10, "height": 10, "depth": 10}
+
+
+def sku(item_id, size, quantity, **fields):
+    return dict(id=item_id, name=item_id, color="#888", width=size, height=size, depth=size,
+                quantity=quantity, **fields)
+
+
+def test_sku_groups_are_expanded_to_units(client):
+    response = client.post("/optimize", json={"bins": [BIN], "items": [sku("sku", 5, 3)]})
+    assert response.status_code == 200
+    body = response.json()
+    packed = body["packed_bins"][0]["packed_items"]
+    assert [item["id"] for item in packed] == ["sku-1", "sku-2", "sku-3"]
+    assert all(item["quantity"] == 1 for item in packed)
+    assert body["packed_bins"][0]["placements"] is None
+    assert (body["total_items"], body["packed_count"]) == (3, 3)
+
+
+def test_single_units_keep_their_id(client):
+    body = client.post("/optimize", json={"bins": [BIN], "items": [sku("one", 5, 1)]}).json()
+    assert [item["id"] for item in body["packed_bins"][0]["packed_items"]] == ["one"]
+
+
+def test_compact_response_groups_positions(client):
+    response = client.post("/optimize", json={"bins": [BIN], "items": [sku("sku", 5, 3)], "compact": True})
+    packed_bin = response.json()["packed_bins"][0]
+    assert packed_bin["packed_items"] == []
+    assert [p["item_id"] for p in packed_bin["placements"]] == ["sku"]
+    assert len(packed_bin["placements"][0]["positions"]) == 3
+
+
+def test_units_left_over_stay_grouped(client):
+    # Eight 5-unit cubes fill the bin; two are left
+    body = client.post("/optimize", json={"bins": [BIN], "items": [sku("sku", 5, 10)]}).json()
+    assert body["packed_count"] == 8
+    assert [(item["id"], item["quantity"]) for item in body["unpacked_items"]] == [("sku", 2)]
+
+
+def test_group_placements_is_the_stored_form():
+    request = PackingRequest(bins=[BIN, BIN], items=[sku("a", 5, 2), sku("b", 2, 1, rotation="any")])
+    result = (
+        [(25.0, [(0, 0, 0, 0, 0), (1, 5, 0, 0, 3), (0, 0, 5, 0, 0)]), (12.5, [(0, 0, 0, 0, 0)])],
+        [],
+        None,
+    )
+    assert PackingController().group_placements(request, result) == [
+        {
+            "bin_id": "Bin 1",
+            "efficiency": 25.0,
+            "placements": [
+                {"item_id": "a", "positions": [[0, 0, 0], [0, 5, 0]], "rotations": None},
+                {"item_id": "b", "positions": [[5, 0, 0]], "rotations": [3]},
+            ],
+        },
+        {
+            "bin_id": "Bin 2",
+            "efficiency": 12.5,
+            "placements": [{"item_id": "a", "positions": [[0, 0, 0]], "rotations": None}],
+        },
+    ]
@@ -0,0 +1,72 @@
+from app.services.ems_packer import EMSPackingEngine
+from app.services.packer import PackingEngine
+from app.services.sequence_search import PrefixStateCache, SequenceSearch
+import pytest
+import random
+
+
+def manifest(make_item, seed=11, skus=20):
+    rng = random.Random(seed)
+    return [
+        make_item(
+            rng.randint(2, 9), rng.randint(2, 9), rng.randint(2, 9),
+            quantity=rng.randint(1, 5), rotation="any",
+            weight=rng.choice([None, rng.uniform(1, 20)]),
+            max_stack_weight=rng.choice([None, 30.0]),
+        )
+        for _ in range(skus)
+    ]
+
+
+@pytest.mark.parametrize("engine_class", [PackingEngine, EMSPackingEngine])
+@pytest.mark.parametrize("min_support", [0.0, 0.75])
+def test_evaluation_matches_a_full_packing_pass(make_item, make_bin, engine_class, min_support):
+    items = manifest(make_item)
+    bins = [make_bin(15, 15, 15), make_bin(10, 10, 10)]
+    search = SequenceSearch(engine_class(min_support=min_support), iterations=0, cache=PrefixStateCache(stride=2))
+    search.search(bins, items)
+
+    rng = random.Random(5)
+    sequence = list(range(len(items)))
+    for _ in range(10):
+        # Later evaluations resume from cached prefixes of earlier ones
+        i, j = sorted(rng.sample(range(len(items)), 2))
+        sequence[i], sequence[j] = sequence[j], sequence[i]
+        volume = search._evaluate(sequence, i)
+
+        packed_bins, _ = engine_class(min_support=min_support).pack_sequence(bins, [items[k] for k in sequence])
+        expected = sum(p.width * p.height * p.depth for b in packed_bins for p in b["placements"])
+        assert volume == pytest.approx(expected)
+    assert search.cache.hits > 0
+
+
+def test_search_never_returns_a_worse_order(make_item, make_bin):
+    items = manifest(make_item, seed=2)
+    bins = [make_bin(12, 12, 12)]
+    baseline, _ = PackingEngine().pack(bins, items)
+    searched, _ = SequenceSearch(PackingEngine(), iterations=40, seed=1).pack(bins, items)
+
+    def packed_volume(packed_bins):
+        return sum(p.width * p.height * p.depth for b in packed_bins for p in b["placements"])
+    assert packed_volume(searched) >= packed_volume(baseline) - 1e-9
+
+
+def test_zero_time_limit_stops_after_the_initial_order(make_item, make_bin):
+    items = manifest(make_item, seed=4)
+    search = SequenceSearch(PackingEngine(), iterations=1000, time_limit=0)
+    search.search([make_bin(12, 12, 12)], items)
+    assert search.evaluations == 1
+
+
+def test_moves_favour_the_end_of_the_order(make_item, make_bin):
+    items = manifest(make_item, seed=6, skus=40)
+    search = SequenceSearch(PackingEngine(), iterations=300, seed=3)
+    starts = []
+    evaluate = search._evaluate
+    search._evaluate = lambda sequence, changed_from: starts.append(changed_from) or evaluate(sequence, changed_from)
+    search.search([make_bin(15, 15, 15)], items)
+
+    # Uniform swaps would first change position n/3 on average
+    moves = starts[1:]
+    assert sum(moves) / len(moves) > 0.6 * len(items)
+    assert min(moves) < len(items) / 2
@@ -0,0 +1,36 @@
+from app.services.stats import MAX_TRACE_ENTRIES, PackingCounters
+
+
+def test_attempts_are_counted_and_sampled():
+    counters = PackingCounters(trace_every=2)
+    for attempt in range(5):
+        counters.record_attempt("box", 0, (attempt, 0, 0) if attempt < 3 else None, tested=attempt)
+    summary = counters.to_dict(item_key=str.upper)
+    assert summary["placements"] == 3
+    assert summary["fit_failures"] == {"BOX": 2}
+    assert summary["trace"] == [("BOX", 0, [1, 0, 0], 1), ("BOX", 0, None, 3)]
+
+
+def test_trace_is_bounded():
+    counters = PackingCounters(trace_every=1)
+    for _ in range(MAX_TRACE_ENTRIES + 10):
+        counters.record_attempt("box", 0, (0, 0, 0), tested=1)
+    assert len(counters.trace) == MAX_TRACE_ENTRIES
+
+
+def test_stats_through_the_api(client):
+    items = [
+        {"id": "big", "name": "big", "color": "#888", "width": 6, "height": 6, "depth": 6, "quantity": 2},
+        {"id": "small", "name": "small", "color": "#888", "width": 2, "height": 2, "depth": 2, "quantity": 20},
+    ]
+    request = {"bins": [{"width": 10, "height": 10, "depth": 10}], "items": items, "search_iterations": 5}
+    assert client.post("/optimize", json=request).json()["stats"] is None
+
+    body = client.post("/optimize", json=dict(request, stats=True, trace_sample=1)).json()
+    stats = body["stats"]
+    # Counters describe the returned plan, in request ids
+    assert stats["placements"] == body["packed_count"]
+    assert stats["fit_failures"].get("big") == 1
+    assert stats["search_evaluations"] >= 1
+    assert {entry["item_id"] for entry in stats["trace"]} == {"big", "small"}
+    assert all(entry["bin_id"] == "Bin 1" for entry in stats["trace"])
@@ -0,0 +1,99 @@
+from app.models.sql_models import OptimizationRecord
+from app.services.stored_plans import packed_bins
+import json
+
+
+def optimize(client, quantity=40):
+    items = [{"id": "sku", "name": "box", "width": 10, "height": 10, "depth": 10, "color": "#888", "quantity": quantity}]
+    response = client.post("/optimize", json={"bins": [{"width": 100, "height": 100, "depth": 100}], "items": items})
+    assert response.status_code == 200
+    return response.json()["record_id"]
+
+
+def legacy_items():
+    return [
+        {"id": f"box-{i}", "name": "box", "width": 10, "height": 10, "depth": 10, "color": "#888", "x": 10 * i, "y": 0, "z": 0}
+        for i in range(3)
+    ]
+
+
+def test_legacy_flat_list_becomes_one_bin():
+    items = legacy_items() + [dict(legacy_items()[0], x=50)]
+    record = OptimizationRecord(efficiency=12.5, packed_items_json=json.dumps(items))
+    assert packed_bins(record) == [{
+        "bin_id": "Bin 1",
+        "efficiency": 12.5,
+        "placements": [
+            {"item_id": "box-0", "positions": [[0, 0, 0], [50, 0, 0]]},
+            {"item_id": "box-1", "positions": [[10, 0, 0]]},
+            {"item_id": "box-2", "positions": [[20, 0, 0]]},
+        ],
+    }]
+
+
+def test_grouped_bins_are_returned_as_stored():
+    stored = [{"bin_id": "Bin 1", "efficiency": 10.0, "placements": []}]
+    assert packed_bins(OptimizationRecord(packed_items_json=json.dumps(stored))) == stored
+    assert packed_bins(OptimizationRecord(packed_items_json=None)) == []
+
+
+def test_stored_plan_round_trip(client):
+    record_id = optimize(client)
+    plan = client.get(f"/optimizations/{record_id}").json()
+    assert plan["id"] == record_id
+    assert plan["packed_bins"][0]["placements"][0]["item_id"] == "sku"
+    assert len(plan["packed_bins"][0]["placements"][0]["positions"]) == 40
+
+
+def test_revalidation_with_weak_etag(client):
+    record_id = optimize(client)
+    response = client.get(f"/optimizations/{record_id}")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "max-age" in response.headers["cache-control"]
+
+    for validator in (etag, etag[2:], f'"other", {etag}', "*"):
+        revalidated = client.get(f"/optimizations/{record_id}", headers={"If-None-Match": validator})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+        assert "Accept-Encoding" in revalidated.headers["vary"]
+        assert revalidated.content == b""
+
+    assert client.get(f"/optimizations/{record_id}", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_gzip_and_identity_share_the_etag(client):
+    record_id = optimize(client, quantity=300)
+    compressed = client.get(f"/optimizations/{record_id}", headers={"Accept-Encoding": "gzip"})
+    identity = client.get(f"/optimizations/{record_id}", headers={"Accept-Encoding": "identity"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["etag"] == identity.headers["etag"]
+    assert compressed.json() == identity.json()
+
+
+def test_missing_plan(client):
+    assert client.get("/optimizations/999").status_code == 404
+
+
+def test_legacy_record_is_served(client, db):
+    items = legacy_items()
+    db.add(OptimizationRecord(
+        bin_width=100, bin_height=10, bin_depth=10, item_count=3, efficiency=30.0,
+        items_json=json.dumps(items), packed_items_json=json.dumps(items), unpacked_items_json="[]",
+    ))
+    db.commit()
+    response = client.get("/optimizations/1")
+    assert response.status_code == 200
+    bins = response.json()["packed_bins"]
+    assert len(bins) == 1 and len(bins[0]["placements"]) == 3
+
+
+def test_unreadable_record_is_a_clear_error(client, db):
+    db.add(OptimizationRecord(
+        bin_width=10, bin_height=10, bin_depth=10, item_count=1, efficiency=0.0,
+        items_json="[]", packed_items_json=json.dumps([{"unexpected": True}]), unpacked_items_json="[]",
+    ))
+    db.commit()
+    response = client.get("/optimizations/1")
+    assert response.status_code == 422
@@ -0,0 +1,81 @@
+from app.models.schemas import Bin
+from app.services.validator import find_out_of_bounds, find_overlaps
+import time
+
+
+def place(item, x, y, z):
+    item.x, item.y, item.z = x, y, z
+    return item
+
+
+def test_touching_faces_are_not_overlaps(make_item):
+    items = [
+        place(make_item(2, 2, 2), 0, 0, 0),
+        place(make_item(2, 2, 2), 2, 0, 0),
+        place(make_item(2, 2, 2), 0, 2, 0),
+        place(make_item(2, 2, 2), 0, 0, 2),
+    ]
+    assert find_overlaps(items) == ([], False)
+
+
+def test_overlapping_pairs_are_reported_once(make_item):
+    items = [
+        place(make_item(2, 2, 2), 0, 0, 0),
+        place(make_item(2, 2, 2), 5, 0, 0),
+        place(make_item(2, 2, 2), 1, 1, 1),
+    ]
+    assert find_overlaps(items) == ([(0, 2)], False)
+
+
+def test_rounding_noise_is_tolerated(make_item):
+    items = [place(make_item(2, 2, 2), 0, 0, 0), place(make_item(2, 2, 2), 2 - 1e-9, 0, 0)]
+    assert find_overlaps(items) == ([], False)
+
+
+def test_report_is_truncated_at_the_limit(make_item):
+    items = [place(make_item(2, 2, 2), 0, 0, 0) for _ in range(5)]
+    pairs, truncated = find_overlaps(items, limit=3)
+    assert len(pairs) == 3 and truncated
+
+
+def test_reaching_the_limit_exactly_is_not_truncation(make_item):
+    items = [place(make_item(2, 2, 2), 0, 0, 0) for _ in range(3)]
+    assert find_overlaps(items, limit=3) == ([(0, 1), (0, 2), (1, 2)], False)
+
+
+def test_wall_sharing_one_extent_stays_fast(make_item):
+    # Every box shares its x-extent with all others: quadratic for an x sweep
+    items = [place(make_item(1, 1, 1), 0, y, z) for y in range(100) for z in range(100)]
+    items.append(place(make_item(1, 1, 1), 0.5, 50.5, 50.5))
+    started = time.perf_counter()
+    pairs, truncated = find_overlaps(items)
+    assert time.perf_counter() - started < 2
+    assert sorted(pairs) == [(5050, 10000), (5051, 10000), (5150, 10000), (5151, 10000)] and not truncated
+
+
+def test_out_of_bounds(make_item):
+    items = [
+        place(make_item(5, 5, 5), 0, 0, 0),
+        place(make_item(5, 5, 5), 6, 0, 0),
+        place(make_item(5, 5, 5), -1, 0, 0),
+    ]
+    assert find_out_of_bounds(Bin(width=10, height=10, depth=10), items) == [1, 2]
+
+
+def test_validate_endpoint(client):
+    def box(item_id, x, y=0, z=0):
+        return {"id": item_id, "name": item_id, "color": "#fff",
+                "width": 5, "height": 5, "depth": 5, "x": x, "y": y, "z": z}
+    bin_dims = {"width": 10, "height": 10, "depth": 10}
+
+    response = client.post("/validate", json={"bins": [
+        {"bin_id": "A", "bin": bin_dims, "items": [box("a", 0), box("b", 5)]},
+        {"bin": bin_dims, "items": [box("c", 0), box("d", 3), box("e", 8)]},
+    ]})
+    assert response.status_code == 200
+    assert response.json() == {
+        "valid": False,
+        "overlaps": [{"bin_id": "Bin 2", "first_id": "c", "second_id": "d"}],
+        "out_of_bounds": [{"bin_id": "Bin 2", "item_id": "e"}],
+        "truncated": False,
+    }
@@ -0,0 +1,206 @@
+"""
+Load-test harness for the FlexStore API.
+
+Drives the real ASGI app in-process (same middleware, validation, process
+pool and DB path, with SQLite standing in for Postgres) or a running server,
+with a configurable concurrency and request mix, then prints latency
+percentiles and throughput per request profile.
+
+Examples (from backend/):
+    python -m tools.loadtest --concurrency 16 --requests 400
+    python -m tools.loadtest --mix small=0.9,large=0.1 --output report.json
+    python -m tools.loadtest --url http://localhost:8000 --duration 60
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+# Request profiles: (item rows, units per row, bins, search iterations)
+PROFILES = {
+    "small": (20, 1, 1, 0),
+    "medium": (200, 1, 2, 0),
+    "large": (300, 10, 4, 0),
+    "search": (40, 1, 1, 200),
+}
+
+
+def build_payload(profile: str, rng: random.Random) -> dict:
+    rows, quantity, bins, search_iterations = PROFILES[profile]
+    return {
+        "bins": [{"width": 600, "height": 250, "depth": 250}] * bins,
+        "items": [
+            {
+                "id": f"{profile}-{i}",
+                "name": f"Carton {i}",
+                "width": rng.randint(20, 80),
+                "height": rng.randint(20, 80),
+                "depth": rng.randint(20, 80),
+                "color": "#3b82f6",
+                "quantity": quantity,
+            }
+            for i in range(rows)
+        ],
+        "search_iterations": search_iterations,
+        "compact": quantity > 1,
+    }
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in PROFILES:
+            raise argparse.ArgumentTypeError(f"unknown profile '{name}' (choose from {', '.join(PROFILES)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[tuple], elapsed: float) -> dict:
+    """
+    samples: [(profile, status_code, latency_seconds)]
+    """
+    def stats(rows: List[tuple]) -> dict:
+        latencies = sorted(latency for _, _, latency in rows)
+        statuses: Dict[str, int] = {}
+        for _, status, _ in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for _, status, _ in rows if status != 200),
+            "statuses": statuses,
+            "throughput_rps": round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0,
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        }
+
+    profiles = sorted({profile for profile, _, _ in samples})
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "overall": stats(samples),
+        "profiles": {p: stats([s for s in samples if s[0] == p]) for p in profiles},
+    }
+
+
+def print_report(report: dict, settings: dict):
+    print(f"\nTarget: {settings['target']}  concurrency={settings['concurrency']}  mix={settings['mix']}")
+    print(f"Elapsed: {report['elapsed_s']}s\n")
+    header = f"{'profile':<10}{'reqs':>7}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["profiles"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        print(f"{name:<10}{s['requests']:>7}{s['errors']:>8}{s['throughput_rps']:>9}"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}")
+    statuses = report["overall"]["statuses"]
+    print("\nStatus codes: " + ", ".join(f"{code}={count}" for code, count in sorted(statuses.items())))
+
+
+async def run_load(client, args, mix: Dict[str, float]) -> dict:
+    rng = random.Random(args.seed)
+    names, weights = list(mix), list(mix.values())
+    # Payloads are built up front so generating them is not part of the measurement
+    payloads = {name: [build_payload(name, rng) for _ in range(8)] for name in names}
+
+    samples: List[tuple] = []
+    issued = 0
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def next_request():
+        nonlocal issued
+        if deadline is not None:
+            if time.perf_counter() >= deadline:
+                return None
+        elif issued >= args.requests:
+            return None
+        issued += 1
+        profile = rng.choices(names, weights)[0]
+        return profile, rng.choice(payloads[profile])
+
+    async def worker():
+        while True:
+            job = next_request()
+            if job is None:
+                return
+            profile, payload = job
+            started = time.perf_counter()
+            try:
+                response = await client.post("/optimize", json=payload)
+                status = response.status_code
+            except Exception:
+                status = "error"
+            samples.append((profile, status, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+async def main_async(args, mix: Dict[str, float]) -> dict:
+    import httpx
+
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            return await run_load(client, args, mix)
+
+    # In-process: import the app only now, after DATABASE_URL points at the stand-in DB
+    from app.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            return await run_load(client, args, mix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the FlexStore /optimize route.")
+    parser.add_argument("--url", help="Base URL of a running server; default drives the app in-process")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds instead of a request count")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("small=0.8,large=0.2"),
+                        help=f"Weighted profiles, e.g. small=0.8,large=0.2 (profiles: {', '.join(PROFILES)})")
+    parser.add_argument("--database-url", help="DB for in-process runs (default: throwaway SQLite file)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Save the report as JSON to this path")
+    args = parser.parse_args()
+
+    if not args.url:
+        db_url = args.database_url or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="flexstore-load-"), "load.db")
+        os.environ["DATABASE_URL"] = db_url
+
+    report = asyncio.run(main_async(args, args.mix))
+    settings = {
+        "target": args.url or "in-process ASGI",
+        "concurrency": args.concurrency,
+        "mix": ",".join(f"{k}={v}" for k, v in args.mix.items()),
+    }
+    print_report(report, settings)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": settings, **report}, f, indent=2)
+        print(f"\nReport saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
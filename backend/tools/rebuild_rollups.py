@@ -0,0 +1,41 @@
+"""
+One-off backfill of the analytics rollup (optimization_rollups) from the
+optimization_records already in the database.
+
+Run it once from backend/ when upgrading a database created before the
+rollup existed, before starting the new version (e.g. as a pre-deploy command):
+    python -m tools.rebuild_rollups
+Running it again is a no-op.
+"""
+import argparse
+import os
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the analytics rollup from stored optimizations.")
+    parser.add_argument("--database-url", help="Database to migrate (default: DATABASE_URL)")
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    # Imported late so --database-url takes effect
+    from app.database import SessionLocal, engine
+    from app.models import sql_models
+    from app.services.analytics import rebuild_rollups
+
+    sql_models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        try:
+            count = rebuild_rollups(db)
+        except RuntimeError as e:
+            print(f"Not backfilled: {e}", file=sys.stderr)
+            sys.exit(1)
+    if count is None:
+        print("Rollup backfill already done; nothing to do.")
+    else:
+        print(f"Backfilled analytics rollup from {count} optimization records.")
+
+
+if __name__ == "__main__":
+    main()